@@ -1,17 +1,21 @@
 # Kore package
 
-from .client import (
-    AsyncKoreClient,
-    KoreAuthError,
-    KoreClient,
-    KoreError,
-    KoreNotFoundError,
-    KoreRateLimitError,
-    KoreServerError,
-    KoreValidationError,
-)
+from typing import TYPE_CHECKING
+
 from .config import VERSION as __version__
 
+if TYPE_CHECKING:
+    from .client import (
+        AsyncKoreClient,
+        KoreAuthError,
+        KoreClient,
+        KoreError,
+        KoreNotFoundError,
+        KoreRateLimitError,
+        KoreServerError,
+        KoreValidationError,
+    )
+
 __all__ = [
     "__version__",
     "KoreClient",
@@ -23,3 +27,12 @@ __all__ = [
     "KoreRateLimitError",
     "KoreServerError",
 ]
+
+
+def __getattr__(name: str):
+    # SDK importato al primo accesso: server e MCP non pagano l'import di httpx all'avvio
+    if name in __all__:
+        from . import client
+
+        return getattr(client, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
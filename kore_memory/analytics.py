@@ -12,12 +12,6 @@ from .database import get_connection
 def get_analytics(agent_id: str = "default") -> dict:
     """Compute comprehensive analytics for an agent's memory store."""
     with get_connection() as conn:
-        # Total memories
-        total = conn.execute(
-            "SELECT COUNT(*) FROM memories WHERE agent_id = ? AND compressed_into IS NULL AND archived_at IS NULL",
-            (agent_id,),
-        ).fetchone()[0]
-
         # Category distribution
         cat_rows = conn.execute(
             """SELECT category, COUNT(*) AS cnt
@@ -38,22 +32,37 @@ def get_analytics(agent_id: str = "default") -> dict:
         ).fetchall()
         importance_dist = {str(r["importance"]): r["cnt"] for r in imp_rows}
 
-        # Decay distribution (buckets: healthy >0.7, fading 0.3-0.7, critical <0.3)
-        decay_rows = conn.execute(
+        # Totale, bucket di decay e pattern di accesso: un solo passaggio sulle memorie attive
+        # (decay: healthy >0.7, fading 0.3-0.7, critical <0.3)
+        stats = conn.execute(
             """SELECT
+                COUNT(*) AS total,
                 SUM(CASE WHEN decay_score > 0.7 THEN 1 ELSE 0 END) AS healthy,
                 SUM(CASE WHEN decay_score BETWEEN 0.3 AND 0.7 THEN 1 ELSE 0 END) AS fading,
                 SUM(CASE WHEN decay_score < 0.3 THEN 1 ELSE 0 END) AS critical,
-                ROUND(AVG(decay_score), 3) AS avg_decay
+                ROUND(AVG(decay_score), 3) AS avg_decay,
+                SUM(CASE WHEN access_count = 0 THEN 1 ELSE 0 END) AS never_accessed,
+                SUM(CASE WHEN access_count BETWEEN 1 AND 5 THEN 1 ELSE 0 END) AS low_access,
+                SUM(CASE WHEN access_count BETWEEN 6 AND 20 THEN 1 ELSE 0 END) AS medium_access,
+                SUM(CASE WHEN access_count > 20 THEN 1 ELSE 0 END) AS high_access,
+                ROUND(AVG(access_count), 1) AS avg_access
                FROM memories
                WHERE agent_id = ? AND compressed_into IS NULL AND archived_at IS NULL""",
             (agent_id,),
         ).fetchone()
+        total = stats["total"]
         decay_analysis = {
-            "healthy": decay_rows["healthy"] or 0,
-            "fading": decay_rows["fading"] or 0,
-            "critical": decay_rows["critical"] or 0,
-            "avg_decay": decay_rows["avg_decay"] or 0.0,
+            "healthy": stats["healthy"] or 0,
+            "fading": stats["fading"] or 0,
+            "critical": stats["critical"] or 0,
+            "avg_decay": stats["avg_decay"] or 0.0,
+        }
+        access_patterns = {
+            "never_accessed": stats["never_accessed"] or 0,
+            "low_access": stats["low_access"] or 0,
+            "medium_access": stats["medium_access"] or 0,
+            "high_access": stats["high_access"] or 0,
+            "avg_access": stats["avg_access"] or 0.0,
         }
 
         # Top tags
@@ -67,26 +76,6 @@ def get_analytics(agent_id: str = "default") -> dict:
         ).fetchall()
         top_tags = [{"tag": r["tag"], "count": r["cnt"]} for r in tag_rows]
 
-        # Access patterns
-        access_rows = conn.execute(
-            """SELECT
-                SUM(CASE WHEN access_count = 0 THEN 1 ELSE 0 END) AS never_accessed,
-                SUM(CASE WHEN access_count BETWEEN 1 AND 5 THEN 1 ELSE 0 END) AS low_access,
-                SUM(CASE WHEN access_count BETWEEN 6 AND 20 THEN 1 ELSE 0 END) AS medium_access,
-                SUM(CASE WHEN access_count > 20 THEN 1 ELSE 0 END) AS high_access,
-                ROUND(AVG(access_count), 1) AS avg_access
-               FROM memories
-               WHERE agent_id = ? AND compressed_into IS NULL AND archived_at IS NULL""",
-            (agent_id,),
-        ).fetchone()
-        access_patterns = {
-            "never_accessed": access_rows["never_accessed"] or 0,
-            "low_access": access_rows["low_access"] or 0,
-            "medium_access": access_rows["medium_access"] or 0,
-            "high_access": access_rows["high_access"] or 0,
-            "avg_access": access_rows["avg_access"] or 0.0,
-        }
-
         # Memory growth over time (last 30 days, grouped by day)
         growth_rows = conn.execute(
             """SELECT DATE(created_at) AS day, COUNT(*) AS cnt
@@ -85,6 +85,10 @@ async def require_auth(
     In local-only mode, skips auth for 127.0.0.1 requests.
     Returns the validated API key (or 'local' for unauthenticated local requests).
     """
+    return _check_key(request, x_kore_key)
+
+
+def _check_key(request: Request, x_kore_key: str | None) -> str:
     if _local_only_mode() and _is_local(request):
         return "local"
 
@@ -113,9 +117,26 @@ async def get_agent_id(
     Defaults to 'default' when not provided.
     Agent IDs are sanitized to alphanumeric + dash/underscore only.
     """
+    return _sanitize_agent_id(x_agent_id)
+
+
+def _sanitize_agent_id(x_agent_id: str | None) -> str:
     agent_id = (x_agent_id or "default").strip()
     # Sanitize: only allow safe chars
     safe = "".join(c for c in agent_id if c.isalnum() or c in "-_")
     if not safe:
         safe = "default"
     return safe[:64]  # max 64 chars
+
+
+async def auth_and_agent(
+    request: Request,
+    x_kore_key: str | None = Header(default=None, alias="X-Kore-Key"),
+    x_agent_id: str | None = Header(default=None, alias="X-Agent-Id"),
+) -> str:
+    """
+    FastAPI dependency: require_auth + get_agent_id in a single resolution.
+    Raises like require_auth on auth failure; returns the sanitized agent namespace.
+    """
+    _check_key(request, x_kore_key)
+    return _sanitize_agent_id(x_agent_id)
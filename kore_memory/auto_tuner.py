@@ -149,53 +149,40 @@ def get_scoring_stats(agent_id: str | None = None) -> dict:
             where += " AND agent_id = ?"
             params.append(agent_id)
 
-        # Total count
-        total = conn.execute(f"SELECT COUNT(*) FROM memories {where}", params).fetchone()[0]
-
-        if total == 0:
-            return {
-                "total": 0,
-                "distribution": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0},
-                "avg_importance": 0.0,
-                "avg_access_count": 0.0,
-                "never_accessed_30d": 0,
-                "frequently_accessed": 0,
-            }
-
-        # Importance distribution
-        dist_rows = conn.execute(
-            f"SELECT importance, COUNT(*) as cnt FROM memories {where} GROUP BY importance",
-            params,
-        ).fetchall()
-        distribution = {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0}
-        for row in dist_rows:
-            distribution[str(row["importance"])] = row["cnt"]
-
-        # Averages
-        avgs = conn.execute(
-            f"SELECT AVG(importance) as avg_imp, AVG(access_count) as avg_acc FROM memories {where}",
-            params,
+        # Un solo passaggio sulla tabella: conteggi, medie e distribuzione insieme
+        row = conn.execute(
+            f"""
+            SELECT COUNT(*) AS total,
+                   AVG(importance) AS avg_imp,
+                   AVG(access_count) AS avg_acc,
+                   SUM(importance = 1) AS imp1,
+                   SUM(importance = 2) AS imp2,
+                   SUM(importance = 3) AS imp3,
+                   SUM(importance = 4) AS imp4,
+                   SUM(importance = 5) AS imp5,
+                   SUM(access_count = 0 AND created_at <= datetime('now', '-30 days')) AS never_30d,
+                   SUM(access_count >= ?) AS frequent
+            FROM memories {where}
+            """,
+            [BOOST_ACCESS_THRESHOLD, *params],
         ).fetchone()
-        avg_importance = round(avgs["avg_imp"] or 0.0, 2)
-        avg_access_count = round(avgs["avg_acc"] or 0.0, 2)
 
-        # Never accessed, older than 30 days
-        never_sql = f"""
-            SELECT COUNT(*) FROM memories
-            {where}
-              AND access_count = 0
-              AND created_at <= datetime('now', '-30 days')
-        """
-        never_accessed_30d = conn.execute(never_sql, params).fetchone()[0]
+    total = row["total"]
+    if total == 0:
+        return {
+            "total": 0,
+            "distribution": {"1": 0, "2": 0, "3": 0, "4": 0, "5": 0},
+            "avg_importance": 0.0,
+            "avg_access_count": 0.0,
+            "never_accessed_30d": 0,
+            "frequently_accessed": 0,
+        }
 
-        # Frequently accessed (access_count >= threshold)
-        freq_sql = f"""
-            SELECT COUNT(*) FROM memories
-            {where}
-              AND access_count >= ?
-        """
-        freq_params = params + [BOOST_ACCESS_THRESHOLD]
-        frequently_accessed = conn.execute(freq_sql, freq_params).fetchone()[0]
+    distribution = {str(level): row[f"imp{level}"] for level in range(1, 6)}
+    avg_importance = round(row["avg_imp"] or 0.0, 2)
+    avg_access_count = round(row["avg_acc"] or 0.0, 2)
+    never_accessed_30d = row["never_30d"]
+    frequently_accessed = row["frequent"]
 
     return {
         "total": total,
@@ -21,6 +21,7 @@ from .embedder import cosine_similarity, deserialize
 from .events import MEMORY_COMPRESSED, emit
 from .models import MemorySaveRequest
 from .repository import _compress_lock, save_memory
+from .vector_index import get_index
 
 SIMILARITY_THRESHOLD = config.SIMILARITY_THRESHOLD
 MAX_COMPRESSION_DEPTH = 3  # Limite massimo catena di compressione
@@ -370,4 +371,6 @@ def _merge_cluster(cluster: list[dict], agent_id: str = "default") -> int | None
             [(new_id, mid) for mid in ids],
         )
 
+    # Gli originali escono dall'indice in memoria: ricarica al prossimo search
+    get_index().invalidate(agent_id)
     return new_id
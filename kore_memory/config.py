@@ -24,6 +24,12 @@ HOST = os.getenv("KORE_HOST", "127.0.0.1")
 PORT = int(os.getenv("KORE_PORT", "8765"))
 LOCAL_ONLY = os.getenv("KORE_LOCAL_ONLY", "1") == "1"
 
+# ── Database ──────────────────────────────────────────────────────────────────
+
+# Max concurrent SQLite worker threads. Clamped to 1: 0 would make the DB limiter block forever
+# and Queue(maxsize=0) would leave the connection pool unbounded
+DB_POOL_SIZE = max(1, int(os.getenv("KORE_DB_POOL_SIZE", "4")))
+
 # ── CORS ──────────────────────────────────────────────────────────────────────
 
 CORS_ORIGINS = [o.strip() for o in os.getenv("KORE_CORS_ORIGINS", "").split(",") if o.strip()]
@@ -47,6 +53,14 @@ RATE_LIMITS: dict[str, tuple[int, int]] = {
 EMBED_MODEL = os.getenv("KORE_EMBED_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
 MAX_EMBED_CHARS = int(os.getenv("KORE_MAX_EMBED_CHARS", "8000"))
 EMBED_BACKEND = os.getenv("KORE_EMBED_BACKEND", "")  # "onnx" for ONNX backend
+QUERY_EMBED_CACHE_SIZE = int(os.getenv("KORE_QUERY_EMBED_CACHE_SIZE", "512"))  # 0 = disabled
+EMBED_INT8 = os.getenv("KORE_EMBED_INT8", "0") == "1"  # store embeddings quantized to int8
+
+# ── Semantic result cache ────────────────────────────────────────────────────
+# Near-duplicate queries (cosine >= threshold) reuse a recent first page of /search results.
+# Opt-in: 0 = disabled. 0.97 is a reasonable value; entries expire on any write or after the TTL.
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("KORE_SEMANTIC_CACHE_THRESHOLD", "0"))
+SEMANTIC_CACHE_TTL = float(os.getenv("KORE_SEMANTIC_CACHE_TTL", "60"))
 
 # ── Compressor ────────────────────────────────────────────────────────────────
 
@@ -69,7 +69,15 @@ def _load_template() -> str:
 
 _DASHBOARD_HTML: str = _load_template()
 
+# Pre-split sui tag <script>: per ogni richiesta cambia solo il nonce CSP
+_DASHBOARD_PARTS: tuple[str, ...] = tuple(_DASHBOARD_HTML.split("<script>"))
+
 
 def get_dashboard_html() -> str:
     """Ritorna l'HTML completo della dashboard."""
     return _DASHBOARD_HTML
+
+
+def render_dashboard_html(nonce: str) -> str:
+    """Ritorna l'HTML della dashboard con il nonce CSP iniettato in ogni tag <script>."""
+    return f'<script nonce="{nonce}">'.join(_DASHBOARD_PARTS)
@@ -12,7 +12,10 @@ from queue import Empty, Queue
 
 from . import config
 
-_POOL_SIZE = 4
+_POOL_SIZE = config.DB_POOL_SIZE  # idle connections kept per DB, matches the API worker limiter
+_BUSY_TIMEOUT = 5.0  # seconds a writer waits on SQLite's single write lock before "database is locked"
+_STATEMENT_CACHE = 256  # prepared statements kept per connection (sqlite3 default is 128)
+_OPTIMIZE_EVERY = 1000  # rows inserted between two PRAGMA optimize runs (refreshes planner stats)
 
 # --- sqlite-vec availability ---
 try:
@@ -73,7 +76,9 @@ class _ConnectionPool:
             except (Exception, NameError):
                 pass
         # Crea nuova connessione
-        conn = sqlite3.connect(db_path, check_same_thread=False)
+        conn = sqlite3.connect(
+            db_path, timeout=_BUSY_TIMEOUT, check_same_thread=False, cached_statements=_STATEMENT_CACHE
+        )
         conn.row_factory = sqlite3.Row
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA foreign_keys=ON")
@@ -110,6 +115,19 @@ class _ConnectionPool:
 _pool = _ConnectionPool()
 
 
+# Reindicizza l'FTS solo quando cambiano le colonne indicizzate: decay, accessi e
+# archiviazione aggiornano ogni riga e non devono riscrivere l'indice full-text
+_FTS_UPDATE_TRIGGER = """
+    CREATE TRIGGER IF NOT EXISTS memories_au
+    AFTER UPDATE OF content, category ON memories BEGIN
+        INSERT INTO memories_fts (memories_fts, rowid, content, category)
+        VALUES ('delete', old.id, old.content, old.category);
+        INSERT INTO memories_fts (rowid, content, category)
+        VALUES (new.id, new.content, new.category);
+    END
+"""
+
+
 def init_db() -> None:
     """Initialize the database and create tables if they don't exist."""
     db_path = _get_db_path()
@@ -152,6 +170,15 @@ def init_db() -> None:
             CREATE INDEX IF NOT EXISTS idx_agent_decay_active
                 ON memories (agent_id, compressed_into, archived_at, decay_score DESC);
 
+            -- Filtri per agente + categoria ordinati per data (export, analytics, liste per categoria)
+            CREATE INDEX IF NOT EXISTS idx_memories_agent_cat_created
+                ON memories (agent_id, category, created_at DESC);
+
+            -- search_by_tag: memorie vive per agente già ordinate per importanza/data (niente sort, stop al LIMIT)
+            CREATE INDEX IF NOT EXISTS idx_memories_agent_live_imp
+                ON memories (agent_id, importance DESC, created_at DESC)
+                WHERE compressed_into IS NULL AND archived_at IS NULL;
+
             CREATE VIRTUAL TABLE IF NOT EXISTS memories_fts
             USING fts5(content, category, content='memories', content_rowid='id', tokenize='unicode61');
 
@@ -167,14 +194,6 @@ def init_db() -> None:
                 VALUES ('delete', old.id, old.content, old.category);
             END;
 
-            CREATE TRIGGER IF NOT EXISTS memories_au
-            AFTER UPDATE ON memories BEGIN
-                INSERT INTO memories_fts (memories_fts, rowid, content, category)
-                VALUES ('delete', old.id, old.content, old.category);
-                INSERT INTO memories_fts (rowid, content, category)
-                VALUES (new.id, new.content, new.category);
-            END;
-
             -- Tag per memorie
             CREATE TABLE IF NOT EXISTS memory_tags (
                 memory_id   INTEGER NOT NULL REFERENCES memories(id) ON DELETE CASCADE,
@@ -239,6 +258,18 @@ def init_db() -> None:
             conn.execute("ALTER TABLE memories ADD COLUMN archived_at TEXT DEFAULT NULL")
         if "session_id" not in cols:
             conn.execute("ALTER TABLE memories ADD COLUMN session_id TEXT DEFAULT NULL")
+        # Migrazione: i DB pre-esistenti hanno il trigger FTS su qualsiasi UPDATE
+        trigger_sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'memories_au'"
+        ).fetchone()
+        if trigger_sql is None or "UPDATE OF" not in trigger_sql[0]:
+            conn.execute("DROP TRIGGER IF EXISTS memories_au")
+            conn.execute(_FTS_UPDATE_TRIGGER)
+        # Dopo la migrazione: session_id può non esistere nei DB pre-0.9
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_memories_session"
+            " ON memories (session_id, created_at) WHERE session_id IS NOT NULL"
+        )
 
 
 @contextmanager
@@ -254,3 +285,39 @@ def get_connection():
         raise
     finally:
         _pool.release(db_path, conn)
+
+
+# ── Statistiche del planner ──────────────────────────────────────────────────
+
+_inserted_since_optimize = 0
+_optimize_running = False
+_optimize_lock = threading.Lock()
+
+
+def note_inserts(count: int) -> None:
+    """
+    Count inserted rows and refresh planner stats (PRAGMA optimize) every
+    _OPTIMIZE_EVERY of them, so the per-agent indexes keep being picked as the
+    table grows. The refresh runs on a daemon thread, off the write path; while
+    one is running further triggers are coalesced into it.
+    """
+    global _inserted_since_optimize, _optimize_running
+    with _optimize_lock:
+        _inserted_since_optimize += count
+        if _inserted_since_optimize < _OPTIMIZE_EVERY or _optimize_running:
+            return
+        _inserted_since_optimize = 0
+        _optimize_running = True
+    threading.Thread(target=_optimize, name="kore-optimize", daemon=True).start()
+
+
+def _optimize() -> None:
+    global _optimize_running
+    try:
+        with get_connection() as conn:
+            conn.execute("PRAGMA optimize")
+    except Exception:
+        pass  # solo statistiche: al prossimo giro si riprova
+    finally:
+        with _optimize_lock:
+            _optimize_running = False
@@ -27,31 +27,36 @@ HALF_LIFE: dict[int, float] = {
 # Access reinforcement: each retrieval extends half-life by this factor
 ACCESS_BOOST = 0.15  # +15% half-life per access
 
+_LN2 = math.log(2)
+
 
 def compute_decay(
     importance: int,
     created_at: str,
     last_accessed: str | None,
     access_count: int,
+    now: datetime | None = None,
 ) -> float:
     """
     Compute current decay score (0.0–1.0) for a memory.
     1.0 = perfectly fresh, 0.0 = completely faded.
+    Pass `now` to score many memories against the same instant (decay pass).
     """
+    if now is None:
+        now = datetime.now(UTC)
     reference_time = last_accessed or created_at
     try:
         ref_dt = datetime.fromisoformat(reference_time).replace(tzinfo=UTC)
     except ValueError:
-        ref_dt = datetime.now(UTC)
+        ref_dt = now
 
-    now = datetime.now(UTC)
     days_elapsed = max(0.0, (now - ref_dt).total_seconds() / 86400)
 
     base_half_life = HALF_LIFE.get(importance, 14.0)
     effective_half_life = base_half_life * (1 + ACCESS_BOOST * access_count)
 
     # Ebbinghaus formula: R = e^(-t/S) where S is stability (half-life)
-    decay = math.exp(-days_elapsed * math.log(2) / effective_half_life)
+    decay = math.exp(-days_elapsed * _LN2 / effective_half_life)
     return round(min(1.0, max(0.0, decay)), 4)
 
 
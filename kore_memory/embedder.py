@@ -92,16 +92,30 @@ def embed(text: str) -> list[float]:
 
 
 def embed_query(text: str) -> list[float]:
-    """Return the embedding vector optimized for search queries."""
+    """
+    Return the embedding vector optimized for search queries.
+    Repeated queries (pagination, retried tool calls) are served from an LRU cache.
+    """
+    return list(_embed_query_cached(MODEL_NAME, _truncate(text.strip())))
+
+
+@lru_cache(maxsize=config.QUERY_EMBED_CACHE_SIZE)
+def _embed_query_cached(model_name: str, text: str) -> tuple[float, ...]:
+    # model_name is part of the key only: a model switch never serves stale vectors
     model = get_model()
-    truncated = _truncate(text)
 
     if _has_asymmetric_support(model):
-        vector = model.encode_query(truncated, normalize_embeddings=True)
+        vector = model.encode_query(text, normalize_embeddings=True)
     else:
-        vector = model.encode(truncated, normalize_embeddings=True)
+        vector = model.encode(text, normalize_embeddings=True)
+
+    return tuple(vector.tolist())
 
-    return vector.tolist()
+
+def query_cache_stats() -> dict:
+    """Hit/miss counters of the query embedding cache."""
+    info = _embed_query_cached.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
 
 
 def embed_batch(texts: list[str]) -> list[list[float]]:
@@ -132,20 +146,52 @@ def cosine_similarity(a: list[float], b: list[float]) -> float:
 
 # --- Serialization: base64-encoded struct.pack (~50% smaller than JSON) ---
 
+# Prefisso del formato quantizzato: ':' non appartiene all'alfabeto base64, quindi non è ambiguo
+_INT8_PREFIX = "q8:"
+
+
+def _quantize_int8(vector: list[float]) -> bytes:
+    """Symmetric int8 quantization: float32 scale followed by one signed byte per dimension."""
+    peak = max((abs(x) for x in vector), default=0.0)
+    scale = peak / 127 if peak else 1.0
+    values = [max(-127, min(127, round(x / scale))) for x in vector]
+    return struct.pack(f"<f{len(values)}b", scale, *values)
+
 
 def serialize(vector: list[float]) -> str:
-    """Serialize a float vector to a compact base64 string."""
+    """Serialize a float vector to a compact base64 string (int8-quantized if KORE_EMBED_INT8=1)."""
+    if config.EMBED_INT8:
+        return _INT8_PREFIX + base64.b64encode(_quantize_int8(vector)).decode("ascii")
     binary = struct.pack(f"{len(vector)}f", *vector)
     return base64.b64encode(binary).decode("ascii")
 
 
+def serialize_batch(vectors) -> list[str]:
+    """
+    Serialize many vectors at once (same format as serialize()).
+    With numpy the whole batch is packed by a single tobytes() and sliced per row,
+    instead of one struct.pack per vector.
+    """
+    if not _HAS_NUMPY or config.EMBED_INT8 or len(vectors) == 0:
+        return [serialize(list(v)) for v in vectors]
+    matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    buf = matrix.tobytes()
+    stride = matrix.shape[1] * 4
+    return [base64.b64encode(buf[i : i + stride]).decode("ascii") for i in range(0, len(buf), stride)]
+
+
 def deserialize(blob: str) -> list[float]:
     """
-    Deserialize a vector from either base64 binary or legacy JSON format.
-    Auto-detects format: if the string starts with '[' it's JSON, otherwise base64.
+    Deserialize a vector from base64 float32, int8-quantized or legacy JSON format.
+    Auto-detects format: '[' is JSON, the 'q8:' prefix is int8, otherwise base64 float32.
     """
     if blob.startswith("["):  # Legacy JSON format
         return json.loads(blob)
+    if blob.startswith(_INT8_PREFIX):
+        binary = base64.b64decode(blob[len(_INT8_PREFIX) :])
+        count = len(binary) - 4
+        scale, *values = struct.unpack(f"<f{count}b", binary)
+        return [v * scale for v in values]
     binary = base64.b64decode(blob)
     count = len(binary) // 4
     return list(struct.unpack(f"{count}f", binary))
@@ -15,6 +15,11 @@ logger = logging.getLogger("kore.events")
 EventHandler = Callable[[str, dict[str, Any]], None]
 
 _handlers: dict[str, list[EventHandler]] = defaultdict(list)
+# Bumped on every emit, handlers or not: readers compare it to detect "something was written"
+_generation = 0
+# Contatori di scrittura per agente; _broadcast copre gli eventi senza un agente preciso ("all")
+_agent_generations: dict[str, int] = defaultdict(int)
+_broadcast = 0
 
 # Event types
 MEMORY_SAVED = "memory.saved"
@@ -35,6 +40,7 @@ def on(event: str, handler: EventHandler) -> None:
 def emit(event: str, data: dict[str, Any] | None = None) -> None:
     """Emit an event to all registered handlers."""
     payload = data or {}
+    bump(payload.get("agent_id"))
     for handler in _handlers.get(event, []):
         try:
             handler(event, payload)
@@ -42,6 +48,27 @@ def emit(event: str, data: dict[str, Any] | None = None) -> None:
             logger.exception("Event handler error for %s", event)
 
 
+def bump(agent_id: str | None = None) -> None:
+    """Advance the write generation of one agent, or of every agent when agent_id is None/"all"."""
+    global _generation, _broadcast
+    _generation += 1
+    if agent_id is None or agent_id == "all":
+        _broadcast += 1
+    else:
+        _agent_generations[agent_id] += 1
+
+
+def generation(agent_id: str | None = None) -> int:
+    """
+    Write generation: changes whenever a memory is written.
+    With agent_id, only writes for that agent (or for all agents) change it,
+    so caches keyed per agent survive other agents' writes.
+    """
+    if agent_id is None:
+        return _generation
+    return _broadcast + _agent_generations.get(agent_id, 0)
+
+
 def clear() -> None:
     """Remove all handlers (for testing)."""
     _handlers.clear()
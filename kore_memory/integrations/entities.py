@@ -25,6 +25,9 @@ _spacy_nlp: Any = None
 _spacy_checked: bool = False
 _HAS_SPACY: bool = False
 
+# Max characters passed to spaCy NER per call
+_SPACY_MAX_CHARS = 10000
+
 # Mapping from spaCy entity labels to our entity types
 _SPACY_LABEL_MAP: dict[str, str] = {
     "PERSON": "person",
@@ -58,6 +61,9 @@ def _get_spacy_nlp() -> Any:
                     break
                 except OSError:
                     continue
+        if _spacy_nlp is not None:
+            # Input is always truncated to _SPACY_MAX_CHARS, so align spaCy's own guard
+            _spacy_nlp.max_length = _SPACY_MAX_CHARS
     except ImportError:
         _HAS_SPACY = False
         _spacy_nlp = None
@@ -73,11 +79,14 @@ def spacy_available() -> bool:
 
 # ── Regex-based fallback extractors ──────────────────────────────────────────
 
+# Email and URL patterns only use ASCII character classes — re.ASCII skips the
+# Unicode word-boundary machinery for a faster match.
+
 # Email: standard RFC-ish pattern
-_EMAIL_RE = re.compile(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b")
+_EMAIL_RE = re.compile(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b", re.ASCII)
 
 # URL: http/https URLs
-_URL_RE = re.compile(r"https?://[a-zA-Z0-9._~:/?#\[\]@!$&'()*+,;=%-]+")
+_URL_RE = re.compile(r"https?://[a-zA-Z0-9._~:/?#\[\]@!$&'()*+,;=%-]+", re.ASCII)
 
 # Date: common formats (YYYY-MM-DD, DD/MM/YYYY, MM/DD/YYYY, Month DD YYYY, etc.)
 _DATE_RE = re.compile(
@@ -141,7 +150,10 @@ def _extract_spacy(text: str) -> list[dict[str, str]]:
     if nlp is None:
         return []
 
-    doc = nlp(text[:10000])  # Limit text length for performance
+    # Limit text length for performance — slice only when actually needed
+    if len(text) > _SPACY_MAX_CHARS:
+        text = text[:_SPACY_MAX_CHARS]
+    doc = nlp(text)
     entities: list[dict[str, str]] = []
     seen: set[tuple[str, str]] = set()
 
@@ -285,15 +297,20 @@ def search_entities(
     results: list[dict[str, str]] = []
     for row in rows:
         tag = row["tag"]
-        parts = tag.split(":", 2)
-        if len(parts) == 3:
-            results.append(
-                {
-                    "type": parts[1],
-                    "value": parts[2],
-                    "memory_id": row["memory_id"],
-                    "tag": tag,
-                }
-            )
+        # Tags are `entity:type:value` — locate the type/value separator after the
+        # 7-char prefix and slice directly instead of splitting into a list
+        if not tag.startswith("entity:"):
+            continue
+        sep = tag.find(":", 7)
+        if sep == -1:
+            continue
+        results.append(
+            {
+                "type": tag[7:sep],
+                "value": tag[sep + 1 :],
+                "memory_id": row["memory_id"],
+                "tag": tag,
+            }
+        )
 
     return results
@@ -3,25 +3,55 @@ Kore — FastAPI application
 Memory layer with decay, auto-scoring, compression, semantic search, and auth.
 """
 
+import asyncio
+import base64
+import binascii
+import functools
+import json
+import logging
 import re as _re
 import secrets
+import struct
 
 # ── Rate limiter in-memory ───────────────────────────────────────────────────
 import threading as _rl_threading
 import time
-from collections import defaultdict
-from contextlib import asynccontextmanager
-
-from fastapi import Depends, FastAPI, HTTPException, Query, Request
+import uuid
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any
+
+import anyio
+from anyio import CapacityLimiter, to_thread
+from anyio.lowlevel import RunVar
+from fastapi import BackgroundTasks, Depends, FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response, StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# orjson optional (installed with [fast]): C encoder for hand-built JSON payloads
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+    _HAS_ORJSON = False
 
 from . import config
-from .auth import get_agent_id, require_auth
-from .dashboard import get_dashboard_html
-from .database import init_db
+from .acl import get_shared_memories, grant_access, list_permissions, revoke_access
+from .analytics import get_analytics
+from .audit import query_audit_log, register_audit_handler
+from .auth import _is_local, _local_only_mode, auth_and_agent, get_or_create_api_key, require_auth
+from .auto_tuner import get_scoring_stats, run_auto_tune
+from .compressor import run_compression
+from .dashboard import render_dashboard_html
+from .database import _pool, get_connection, init_db
+from .integrations.entities import search_entities
 from .models import (
     ACLGrantRequest,
     ACLResponse,
@@ -40,6 +70,7 @@ from .models import (
     EntityRecord,
     GDPRDeleteResponse,
     GraphTraverseResponse,
+    JobResponse,
     MemoryExportResponse,
     MemoryImportRequest,
     MemoryImportResponse,
@@ -61,27 +92,30 @@ from .models import (
     TagRequest,
     TagResponse,
 )
+from .plugins import list_plugins
 from .repository import (
-    add_relation,
-    add_tags,
+    _embeddings_available,
+    add_relation_returning,
+    add_tags_returning,
     archive_memory,
     cleanup_expired,
     create_session,
     delete_memory,
     delete_session,
     end_session,
-    export_memories,
     get_archived,
     get_memory,
     get_relations,
     get_session_memories,
     get_session_summary,
+    get_stats,
     get_tags,
     get_timeline,
     import_memories,
+    iter_export_memories,
     list_agents,
     list_sessions,
-    remove_tags,
+    remove_tags_returning,
     restore_memory,
     run_decay_pass,
     save_memory,
@@ -91,126 +125,426 @@ from .repository import (
     traverse_graph,
     update_memory,
 )
+from .summarizer import summarize_topic
+
+logger = logging.getLogger("kore.api")
+
+# ── JSON encoding ───────────────────────────────────────────────────────────
+
+
+def _json_dumps(obj: Any) -> str:
+    """Compact JSON string (orjson when available)."""
+    if _HAS_ORJSON:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when installed, stdlib json otherwise.
+    Used for payloads built by hand; response_model endpoints already serialize
+    straight to bytes through pydantic."""
+
+    def render(self, content: Any) -> bytes:
+        if _HAS_ORJSON:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+# Bound once at import: no config attribute chain on the hot path
+_RATE_LIMITS: dict[str, tuple[int, int]] = dict(config.RATE_LIMITS)
+_RATE_SHARDS = 64  # power of two: shard = hash(key) & (_RATE_SHARDS - 1)
+_RATE_MAX_BUCKETS = 10_000  # hard cap on tracked (ip, path) pairs, spread across shards
+_RATE_SHARD_CAP = max(1, _RATE_MAX_BUCKETS // _RATE_SHARDS)
+# A bucket untouched for the longest configured window holds no live timestamps
+_RATE_MAX_WINDOW_NS = max((w for _, w in _RATE_LIMITS.values()), default=0) * 1_000_000_000
+
+
+class _RingBucket:
+    """
+    Timestamps (monotonic ns, 0 = unused slot) of the last max_requests hits, as a fixed ring.
+    The slot under head is the oldest hit: if it is still inside the window the limit is reached.
+    O(1) check-and-insert, 8 bytes per slot, no per-request allocation.
+    """
+
+    __slots__ = ("ts", "head")
+
+    def __init__(self, size: int) -> None:
+        self.ts = array("q", bytes(8 * size))
+        self.head = 0
+
+    def hit(self, now_ns: int, window_ns: int) -> bool:
+        """Record a hit at now_ns. Returns False (nothing recorded) if the limit is exceeded."""
+        head = self.head
+        oldest = self.ts[head]
+        if oldest and now_ns - oldest < window_ns:
+            return False
+        self.ts[head] = now_ns
+        self.head = (head + 1) % len(self.ts)
+        return True
+
+    @property
+    def last(self) -> int:
+        """Most recent hit (0 if none): the slot just before head."""
+        return self.ts[self.head - 1]
+
+
+class _RateBuckets:
+    """
+    Rate-limit buckets split into independently locked shards.
+    Concurrent requests only contend with peers hashed to the same shard.
+    Each shard is an LRU (OrderedDict): the least recently seen client is at the head,
+    so stale buckets are evicted from the head without scanning the shard.
+    Each bucket is a _RingBucket sized to the route's max_requests.
+    """
+
+    __slots__ = ("buckets", "locks", "_sweep_cursor")
+
+    def __init__(self, shards: int = _RATE_SHARDS) -> None:
+        self.buckets: list[OrderedDict[str, _RingBucket]] = [OrderedDict() for _ in range(shards)]
+        self.locks = [_rl_threading.Lock() for _ in range(shards)]
+        self._sweep_cursor = 0
+
+    def clear(self) -> None:
+        for lock, shard in zip(self.locks, self.buckets):
+            with lock:
+                shard.clear()
+
+    def sweep_next(self, now_ns: int) -> int:
+        """
+        Evict stale buckets from the next shard in round-robin order.
+        Only one shard lock is held at a time; returns the number of buckets removed.
+        """
+        shard = self._sweep_cursor
+        self._sweep_cursor = (shard + 1) % len(self.buckets)
+        with self.locks[shard]:
+            return _evict_stale(self.buckets[shard], now_ns)
+
 
-_rate_buckets: dict[str, list[float]] = defaultdict(list)
-_rate_lock = _rl_threading.Lock()
-_rate_last_cleanup = 0.0
+def _evict_stale(buckets: OrderedDict[str, _RingBucket], now_ns: int) -> int:
+    """Drop stale buckets from the LRU head until the first live one. Caller holds the shard lock."""
+    removed = 0
+    while buckets:
+        oldest_key, oldest = next(iter(buckets.items()))
+        last = oldest.last
+        if last and now_ns - last < _RATE_MAX_WINDOW_NS:
+            break
+        del buckets[oldest_key]
+        removed += 1
+    return removed
 
 
-_SESSION_ID_RE = _re.compile(r"^[a-zA-Z0-9_\-\.]{1,128}$")
+_rate_buckets = _RateBuckets()
+_RATE_SWEEP_INTERVAL = 60.0  # seconds between background GC passes over all shards
+
+
+async def _rate_sweep_loop() -> None:
+    """Background GC for rate-limit buckets (started in lifespan): keeps the scan off the request path."""
+    while True:
+        await anyio.sleep(_RATE_SWEEP_INTERVAL)
+        now_ns = time.monotonic_ns()
+        # One shard lock at a time: requests on other shards are never blocked
+        for _ in range(_RATE_SHARDS):
+            _rate_buckets.sweep_next(now_ns)
+
+
+_SESSION_ID_MAX_LEN = 128
+_SESSION_ID_FULLMATCH = _re.compile(r"[a-zA-Z0-9_\-.]{1,128}").fullmatch
+
+
+_H_SESSION_ID = b"x-session-id"
+
+
+def _scope_header(scope: Scope, name: bytes) -> str | None:
+    """First value of a header straight from the ASGI scope (names are already lowercase bytes)."""
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
 
 
 def _validate_session_id(raw: str | None) -> str | None:
-    """Validate and sanitize X-Session-Id header. None if absent or invalid."""
+    """Validate and sanitize X-Session-Id header. None if absent or blank."""
     if not raw:
         return None
-    raw = raw.strip()
-    if not _SESSION_ID_RE.match(raw):
+    # Strip only when needed: clean headers (the common case) skip the copy
+    if raw[0].isspace() or raw[-1].isspace():
+        raw = raw.strip()
+        if not raw:
+            return None
+    # Oversized payloads are rejected before touching the regex engine
+    if len(raw) > _SESSION_ID_MAX_LEN or _SESSION_ID_FULLMATCH(raw) is None:
         raise HTTPException(status_code=400, detail="X-Session-Id contains invalid characters")
     return raw
 
 
-def _get_client_ip(request: Request) -> str:
+def _get_client_ip(scope: Scope) -> str:
     """Extract client IP. Ignores X-Forwarded-For in local-only mode to prevent spoofing."""
+    client = scope.get("client")
     # In local-only mode, use the raw socket IP only — prevents
     # spoofing via X-Forwarded-For: 127.0.0.1 to bypass auth/rate-limit
     if config.LOCAL_ONLY:
-        return request.client.host if request.client else "unknown"
-    # Behind a trusted reverse proxy, read the first IP from the chain
-    forwarded = request.headers.get("X-Forwarded-For")
-    if forwarded:
-        return forwarded.split(",")[0].strip()
-    real_ip = request.headers.get("X-Real-IP")
-    if real_ip:
-        return real_ip.strip()
-    return request.client.host if request.client else "unknown"
-
-
-def _check_rate_limit(client_ip: str, path: str) -> None:
-    """Check rate limit for IP + path. Raises HTTPException 429 if exceeded."""
-    limit_conf = config.RATE_LIMITS.get(path)
-    if not limit_conf:
-        return
-    max_requests, window = limit_conf
-    now = time.monotonic()
-    key = f"{client_ip}:{path}"
-
-    with _rate_lock:
-        # Periodic cleanup of stale buckets (every 60s) — prevents memory leak
-        global _rate_last_cleanup
-        if now - _rate_last_cleanup > 60:
-            stale_keys = [
-                k for k, timestamps in _rate_buckets.items() if not timestamps or now - timestamps[-1] > window
-            ]
-            for k in stale_keys:
-                del _rate_buckets[k]
-            _rate_last_cleanup = now
-
-        # Discard expired requests for this bucket
-        _rate_buckets[key] = [ts for ts in _rate_buckets[key] if now - ts < window]
-
-        if len(_rate_buckets[key]) >= max_requests:
+        return client[0] if client else "unknown"
+    # Behind a trusted reverse proxy, read the first IP from the chain.
+    # Single pass over the raw scope headers; X-Forwarded-For wins over X-Real-IP
+    real_ip = None
+    for key, value in scope["headers"]:
+        if key == b"x-forwarded-for" and value:
+            comma = value.find(b",")
+            first = value if comma == -1 else value[:comma]
+            return first.strip().decode("latin-1")
+        if key == b"x-real-ip" and value and real_ip is None:
+            real_ip = value
+    if real_ip is not None:
+        return real_ip.strip().decode("latin-1")
+    return client[0] if client else "unknown"
+
+
+def _make_rate_limiter(path: str) -> Callable[[str], bool]:
+    """
+    Build the limiter for one bucket path. Limits and key suffix are resolved once here,
+    so the request path is never hashed into the config table at request time.
+    The returned callable records a request for a client IP and returns False if the limit is exceeded.
+    """
+    max_requests, window = _RATE_LIMITS[path]
+    window_ns = window * 1_000_000_000
+    suffix = ":" + path
+
+    def check(client_ip: str) -> bool:
+        now_ns = time.monotonic_ns()
+        key = client_ip + suffix
+
+        shard = hash(key) & (_RATE_SHARDS - 1)
+        buckets = _rate_buckets.buckets[shard]
+
+        with _rate_buckets.locks[shard]:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if max_requests <= 0:
+                    return False
+                # Bound memory: only expired buckets make room. Live clients are never evicted,
+                # so rotating X-Forwarded-For cannot reset someone else's quota: a shard full
+                # of live buckets fails closed (429) for new keys until a window expires.
+                if len(buckets) >= _RATE_SHARD_CAP:
+                    _evict_stale(buckets, now_ns)
+                    if len(buckets) >= _RATE_SHARD_CAP:
+                        return False
+                bucket = buckets[key] = _RingBucket(max_requests)
+            else:
+                buckets.move_to_end(key)
+            return bucket.hit(now_ns, window_ns)
+
+    return check
+
+
+# Bucket path -> limiter
+_RATE_LIMITERS: dict[str, Callable[[str], bool]] = {p: _make_rate_limiter(p) for p in _RATE_LIMITS}
+
+
+def _check_rate_limit(client_ip: str, path: str) -> bool:
+    """Record a request for IP + bucket path. Returns False if the rate limit is exceeded."""
+    limiter = _RATE_LIMITERS.get(path)
+    return True if limiter is None else limiter(client_ip)
+
+
+# Endpoint path -> bucket (endpoints mapped to the same bucket share its quota)
+_RATE_LIMITED_ROUTES: dict[str, str] = {
+    "/save": "/save",
+    "/save/batch": "/save",
+    "/search": "/search",
+    "/timeline": "/timeline",
+    "/decay/run": "/decay/run",
+    "/auto-tune": "/decay/run",  # share decay rate limit
+    "/compress": "/compress",
+}
+# Endpoint path -> limiter, precomputed: one dict lookup per request in the middleware
+_ROUTE_LIMITERS: dict[str, Callable[[str], bool]] = {
+    route: _RATE_LIMITERS[bucket] for route, bucket in _RATE_LIMITED_ROUTES.items() if bucket in _RATE_LIMITERS
+}
+
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware: resolves the route limiter and client IP once per request
+    and caches them on request.state. Quota is consumed by _enforce_rate_limit() inside
+    the handler, after auth and validation, so 401/403/422 responses never use it up.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            limiter = _ROUTE_LIMITERS.get(scope["path"])
+            if limiter is not None:
+                scope.setdefault("state", {})["rate_limit"] = (limiter, _get_client_ip(scope))
+        await self.app(scope, receive, send)
+
+
+def _enforce_rate_limit(request: Request) -> None:
+    """Record the request against the limiter cached by RateLimitMiddleware. Raises HTTPException 429 if exceeded."""
+    pending = request.scope.get("state", {}).get("rate_limit")
+    if pending is not None:
+        limiter, client_ip = pending
+        if not limiter(client_ip):
             raise HTTPException(status_code=429, detail="Rate limit exceeded. Retry later.")
 
-        _rate_buckets[key].append(now)
 
+# ── Pagination cursor ────────────────────────────────────────────────────────
 
-# ── Security headers middleware ──────────────────────────────────────────────
+# Opaque cursor: (decay_score, id) packed as big-endian double + int64, urlsafe base64 without padding
+_CURSOR = struct.Struct(">dq")
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    _API_CSP = "default-src 'none'; frame-ancestors 'none'"
-
-    @staticmethod
-    def _dashboard_csp(nonce: str) -> str:
-        """Build CSP for dashboard with per-request nonce instead of unsafe-inline scripts."""
-        return (
-            "default-src 'self'; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-            "font-src 'self' https://fonts.gstatic.com; "
-            f"script-src 'nonce-{nonce}'; "
-            "connect-src 'self'; "
-            "img-src 'self' data:; "
-            "frame-ancestors 'none'"
-        )
+def _encode_cursor(cursor: tuple[float, int]) -> str:
+    return base64.urlsafe_b64encode(_CURSOR.pack(*cursor)).rstrip(b"=").decode("ascii")
+
+
+def _decode_cursor(raw: str) -> tuple[float, int]:
+    """Decode a pagination cursor. Raises HTTPException 400 if malformed."""
+    try:
+        return _CURSOR.unpack(base64.urlsafe_b64decode(raw + "=" * (-len(raw) % 4)))
+    except (binascii.Error, struct.error, ValueError):
+        raise HTTPException(400, "Invalid cursor format") from None
+
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        # Generate a per-request nonce and store it for the dashboard endpoint
-        nonce = secrets.token_urlsafe(16)
-        request.state.csp_nonce = nonce
-
-        response = await call_next(request)
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "0"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        # CSP with nonce for the dashboard, restrictive for APIs
-        if request.url.path == "/dashboard":
-            response.headers["Content-Security-Policy"] = self._dashboard_csp(nonce)
+# Empty result lists are common (new agents, narrow tags): one shared instance, no per-request validation.
+# Only ever handed to FastAPI for serialization, never mutated.
+_EMPTY_SEARCH = MemorySearchResponse(results=[], total=0)
+
+
+def _search_page(results: list) -> MemorySearchResponse:
+    return MemorySearchResponse(results=results, total=len(results)) if results else _EMPTY_SEARCH
+
+
+# ── DB worker threads ────────────────────────────────────────────────────────
+
+# One limiter per event loop (RunVar), sized to the SQLite pool: network
+# concurrency stays on the loop, DB concurrency is capped independently.
+_db_limiter_var: RunVar[CapacityLimiter] = RunVar("kore_db_limiter")
+
+
+def _db_limiter() -> CapacityLimiter:
+    try:
+        return _db_limiter_var.get()
+    except LookupError:
+        limiter = CapacityLimiter(config.DB_POOL_SIZE)
+        _db_limiter_var.set(limiter)
+        return limiter
+
+
+async def _run_db(func, /, *args, **kwargs):
+    """Run a blocking SQLite call on a worker thread bounded by the DB limiter."""
+    if kwargs:
+        func = functools.partial(func, **kwargs)
+    return await to_thread.run_sync(func, *args, limiter=_db_limiter())
+
+
+# Short-lived cache for approximate aggregates (/metrics, /agents): Prometheus scrapes and
+# dashboard polls arriving within the TTL share a single DB round trip
+_AGG_TTL = 2.0
+_AGG_CACHE_MAX = 256
+_agg_cache: dict[tuple, tuple[float, Any]] = {}
+
+
+async def _cached_db(func, *args):
+    """Like _run_db, but reuse a result computed less than _AGG_TTL seconds ago."""
+    key = (func.__name__, *args)
+    now = time.monotonic()
+    hit = _agg_cache.get(key)
+    if hit is not None and now - hit[0] < _AGG_TTL:
+        return hit[1]
+    value = await _run_db(func, *args)
+    if len(_agg_cache) >= _AGG_CACHE_MAX:
+        _agg_cache.clear()
+    _agg_cache[key] = (now, value)
+    return value
+
+
+# ── Security headers middleware ──────────────────────────────────────────────
+
+
+# Header precalcolati come bytes: per richiesta si formatta solo il nonce della dashboard
+_STATIC_HEADERS = (
+    (b"x-content-type-options", b"nosniff"),
+    (b"x-frame-options", b"DENY"),
+    (b"x-xss-protection", b"0"),
+    (b"referrer-policy", b"strict-origin-when-cross-origin"),
+)
+_API_CSP_HEADER = (b"content-security-policy", b"default-src 'none'; frame-ancestors 'none'")
+# Dashboard CSP: per-request nonce instead of unsafe-inline scripts
+_DASH_CSP_PREFIX = (
+    b"default-src 'self'; "
+    b"style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+    b"font-src 'self' https://fonts.gstatic.com; "
+    b"script-src 'nonce-"
+)
+_DASH_CSP_SUFFIX = b"'; connect-src 'self'; img-src 'self' data:; frame-ancestors 'none'"
+_SECURITY_HEADER_NAMES = frozenset(name for name, _ in _STATIC_HEADERS) | {_API_CSP_HEADER[0]}
+# Machine-only endpoints polled by scrapers/load balancers: plain text/JSON, never rendered in a browser
+_SECURITY_HEADERS_SKIP = frozenset({"/metrics", "/health"})
+
+
+class SecurityHeadersMiddleware:
+    """
+    Pure ASGI middleware: injects security headers into http.response.start.
+    Avoids the extra task group and memory stream BaseHTTPMiddleware spawns per request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in _SECURITY_HEADERS_SKIP:
+            await self.app(scope, receive, send)
+            return
+
+        # CSP with nonce for the dashboard, restrictive for APIs.
+        # Only the dashboard uses the nonce: API requests skip the getrandom syscall entirely.
+        if scope["path"] == "/dashboard":
+            nonce = secrets.token_urlsafe(16)
+            scope.setdefault("state", {})["csp_nonce"] = nonce  # read by the endpoint via request.state
+            csp_header = (b"content-security-policy", _DASH_CSP_PREFIX + nonce.encode("ascii") + _DASH_CSP_SUFFIX)
         else:
-            response.headers["Content-Security-Policy"] = self._API_CSP
-        return response
+            csp_header = _API_CSP_HEADER
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Override any header of the same name set by the endpoint
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() not in _SECURITY_HEADER_NAMES]
+                headers.extend(_STATIC_HEADERS)
+                headers.append(csp_header)
+                message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
 
 
 # ── App factory ──────────────────────────────────────────────────────────────
 
+_FAVICON_PATH = Path(__file__).parent.parent / "assets" / "favicon.svg"
+
+
+def _load_favicon() -> bytes | None:
+    try:
+        return _FAVICON_PATH.read_bytes()
+    except OSError:
+        return None
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     init_db()
+    app.state.favicon = _load_favicon()
     # Initialize API key (auto-generate if missing)
-    from .auth import get_or_create_api_key
-
     get_or_create_api_key()
     # Enable audit log if configured
     if config.AUDIT_LOG:
-        from .audit import register_audit_handler
-
         register_audit_handler()
-    yield
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(_rate_sweep_loop)
+        yield
+        tg.cancel_scope.cancel()
     # Graceful shutdown: close the SQLite connection pool
-    from .database import _pool
-
     _pool.clear()
 
 
@@ -223,14 +557,21 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
-# CORS — configurable origins via env, restrictive by default
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=config.CORS_ORIGINS,
-    allow_credentials=False,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["X-Kore-Key", "X-Agent-Id", "Content-Type"],
-)
+# Rate-limit lookup runs innermost; the 429 itself is raised by the handler
+app.add_middleware(RateLimitMiddleware)
+
+# CORS — configurable origins via env, restrictive by default.
+# With no origins configured the middleware would reject every cross-origin request anyway,
+# so it is only mounted when needed (local-only installs skip the extra layer).
+if config.CORS_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=config.CORS_ORIGINS,
+        allow_credentials=False,
+        allow_methods=["GET", "POST", "PUT", "DELETE"],
+        allow_headers=["X-Kore-Key", "X-Agent-Id", "Content-Type"],
+        max_age=86400,  # browsers cache preflight results for a day
+    )
 
 # Security headers on all responses
 app.add_middleware(SecurityHeadersMiddleware)
@@ -239,32 +580,33 @@ app.add_middleware(SecurityHeadersMiddleware)
 # Global handler for unhandled exceptions — no stack trace exposed to client
 @app.exception_handler(Exception)
 async def _global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
-    import logging
-
-    logging.error("Unhandled error: %s", exc, exc_info=True)
-    return JSONResponse(status_code=500, content={"error": "Internal server error"})
+    response = FastJSONResponse(status_code=500, content={"error": "Internal server error"})
+    # Traceback formatting is skipped entirely when error logging is disabled
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error("Unhandled error: %s", exc, exc_info=exc)
+    return response
 
 
 # Shared auth dependencies
 _Auth = Depends(require_auth)
-_Agent = Depends(get_agent_id)
+# Auth + agent namespace resolved as one dependency (one header pass per request)
+_AuthAgent = Depends(auth_and_agent)
 
 
 # ── Core endpoints ────────────────────────────────────────────────────────────
 
 
 @app.post("/save", response_model=MemorySaveResponse, status_code=201)
-def save(
+async def save(
     request: Request,
     req: MemorySaveRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> MemorySaveResponse:
     """Save a memory scoped to the requesting agent. Importance is auto-scored if omitted.
     Use X-Session-Id header to associate the memory with a conversation session."""
-    _check_rate_limit(_get_client_ip(request), "/save")
-    session_id = _validate_session_id(request.headers.get("X-Session-Id"))
-    memory_id, importance = save_memory(req, agent_id=agent_id, session_id=session_id)
+    _enforce_rate_limit(request)
+    session_id = _validate_session_id(_scope_header(request.scope, _H_SESSION_ID))
+    memory_id, importance = await _run_db(save_memory, req, agent_id=agent_id, session_id=session_id)
     return MemorySaveResponse(id=memory_id, importance=importance)
 
 
@@ -272,46 +614,40 @@ def save(
 def save_batch(
     request: Request,
     req: BatchSaveRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> BatchSaveResponse:
     """Save multiple memories in a single request (max 100). Uses batch embedding."""
-    _check_rate_limit(_get_client_ip(request), "/save")
+    _enforce_rate_limit(request)
     results = save_memory_batch(req.memories, agent_id=agent_id)
     saved = [MemorySaveResponse(id=mid, importance=imp) for mid, imp in results]
     return BatchSaveResponse(saved=saved, total=len(saved))
 
 
 @app.get("/search", response_model=MemorySearchResponse)
-def search(
+async def search(
     request: Request,
     q: str = Query(..., min_length=1, description="Search query (any language)"),
     limit: int = Query(5, ge=1, le=20),
     cursor: str | None = Query(None, description="Opaque pagination cursor"),
     category: str | None = Query(None),
     semantic: bool = Query(True),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
     # Deprecated params for backwards compatibility
     offset: int = Query(0, ge=0, deprecated=True, description="Deprecated: use cursor"),
 ) -> MemorySearchResponse:
     """Semantic search scoped to the requesting agent, with cursor-based pagination."""
-    _check_rate_limit(_get_client_ip(request), "/search")
+    _enforce_rate_limit(request)
 
-    # Parse cursor (base64 encoded tuple of decay_score, id)
-    cursor_tuple = None
-    if cursor:
-        try:
-            import base64
-            import json
+    # Parse cursor (packed tuple of decay_score, id)
+    cursor_tuple = _decode_cursor(cursor) if cursor else None
 
-            decoded = base64.b64decode(cursor).decode("utf-8")
-            cursor_tuple = tuple(json.loads(decoded))
-        except Exception:
-            raise HTTPException(400, "Invalid cursor format") from None
+    # Client already gone: skip the query; 499 (client closed request) is what the access log records
+    if await request.is_disconnected():
+        return Response(status_code=499)
 
     # Execute search with cursor
-    results, next_cursor, total_count = search_memories(
+    results, next_cursor, total_count = await _run_db(
+        search_memories,
         query=q,
         limit=limit,
         category=category,
@@ -321,12 +657,7 @@ def search(
     )
 
     # Encode next cursor
-    cursor_str = None
-    if next_cursor:
-        import base64
-        import json
-
-        cursor_str = base64.b64encode(json.dumps(next_cursor).encode("utf-8")).decode("utf-8")
+    cursor_str = _encode_cursor(next_cursor) if next_cursor else None
 
     return MemorySearchResponse(
         results=results,
@@ -338,31 +669,25 @@ def search(
 
 
 @app.get("/timeline", response_model=MemorySearchResponse)
-def timeline(
+async def timeline(
     request: Request,
     subject: str = Query(..., min_length=1),
     limit: int = Query(20, ge=1, le=50),
     cursor: str | None = Query(None, description="Opaque pagination cursor"),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
     offset: int = Query(0, ge=0, deprecated=True, description="Deprecated: use cursor"),
 ) -> MemorySearchResponse:
     """Chronological memory history for a subject, scoped to agent, with cursor-based pagination."""
-    _check_rate_limit(_get_client_ip(request), "/timeline")
+    _enforce_rate_limit(request)
 
     # Parse cursor
-    cursor_tuple = None
-    if cursor:
-        try:
-            import base64
-            import json
+    cursor_tuple = _decode_cursor(cursor) if cursor else None
 
-            decoded = base64.b64decode(cursor).decode("utf-8")
-            cursor_tuple = tuple(json.loads(decoded))
-        except Exception:
-            raise HTTPException(400, "Invalid cursor format") from None
+    if await request.is_disconnected():
+        return Response(status_code=499)
 
-    results, next_cursor, total_count = get_timeline(
+    results, next_cursor, total_count = await _run_db(
+        get_timeline,
         subject=subject,
         limit=limit,
         agent_id=agent_id,
@@ -370,12 +695,7 @@ def timeline(
     )
 
     # Encode next cursor
-    cursor_str = None
-    if next_cursor:
-        import base64
-        import json
-
-        cursor_str = base64.b64encode(json.dumps(next_cursor).encode("utf-8")).decode("utf-8")
+    cursor_str = _encode_cursor(next_cursor) if next_cursor else None
 
     return MemorySearchResponse(
         results=results,
@@ -387,48 +707,37 @@ def timeline(
 
 
 @app.get("/memories/{memory_id}", response_model=MemoryRecord)
-def get_single(
+async def get_single(
     memory_id: int,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> MemoryRecord:
     """Get a single memory by ID. Agents can only access their own memories."""
-    memory = get_memory(memory_id, agent_id=agent_id)
+    memory = await _run_db(get_memory, memory_id, agent_id=agent_id)
     if not memory:
         raise HTTPException(status_code=404, detail="Memory not found")
     return memory
 
 
 @app.put("/memories/{memory_id}", response_model=MemorySaveResponse)
-def update(
+async def update(
     memory_id: int,
     req: MemoryUpdateRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> MemorySaveResponse:
     """Update a memory's content, category, or importance. Agents can only update their own memories."""
-    if not update_memory(memory_id, req, agent_id=agent_id):
+    real_importance = await _run_db(update_memory, memory_id, req, agent_id=agent_id)
+    if real_importance is None:
         raise HTTPException(status_code=404, detail="Memory not found")
-    # Fetch the actual importance from DB (req.importance may be None)
-    from .database import get_connection
-
-    with get_connection() as conn:
-        row = conn.execute(
-            "SELECT importance FROM memories WHERE id = ? AND agent_id = ?",
-            (memory_id, agent_id),
-        ).fetchone()
-    real_importance = row["importance"] if row else 1
     return MemorySaveResponse(id=memory_id, importance=real_importance, message="Memory updated")
 
 
 @app.delete("/memories/{memory_id}", status_code=204)
-def delete(
+async def delete(
     memory_id: int,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> None:
     """Delete a memory. Agents can only delete their own memories."""
-    if not delete_memory(memory_id, agent_id=agent_id):
+    if not await _run_db(delete_memory, memory_id, agent_id=agent_id):
         raise HTTPException(status_code=404, detail="Memory not found")
 
 
@@ -436,106 +745,157 @@ def delete(
 
 
 @app.post("/memories/{memory_id}/tags", response_model=TagResponse, status_code=201)
-def tag_add(
+async def tag_add(
     memory_id: int,
     req: TagRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> TagResponse:
     """Add tags to a memory."""
-    count = add_tags(memory_id, req.tags, agent_id=agent_id)
-    tags = get_tags(memory_id, agent_id=agent_id)
+    count, tags = await _run_db(add_tags_returning, memory_id, req.tags, agent_id=agent_id)
     return TagResponse(count=count, tags=tags)
 
 
 @app.delete("/memories/{memory_id}/tags", response_model=TagResponse)
-def tag_remove(
+async def tag_remove(
     memory_id: int,
     req: TagRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> TagResponse:
     """Remove tags from a memory."""
-    remove_tags(memory_id, req.tags, agent_id=agent_id)
-    tags = get_tags(memory_id, agent_id=agent_id)
+    _, tags = await _run_db(remove_tags_returning, memory_id, req.tags, agent_id=agent_id)
     return TagResponse(count=len(tags), tags=tags)
 
 
 @app.get("/memories/{memory_id}/tags", response_model=TagResponse)
-def tag_list(
+async def tag_list(
     memory_id: int,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> TagResponse:
     """Return the tags of a memory (only if it belongs to the agent)."""
-    tags = get_tags(memory_id, agent_id=agent_id)
+    tags = await _run_db(get_tags, memory_id, agent_id=agent_id)
     return TagResponse(count=len(tags), tags=tags)
 
 
 @app.get("/tags/{tag}/memories", response_model=MemorySearchResponse)
-def tag_search(
+async def tag_search(
     tag: str,
     limit: int = Query(20, ge=1, le=50),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> MemorySearchResponse:
     """Search memories by tag."""
-    results = search_by_tag(tag, agent_id=agent_id, limit=limit)
-    return MemorySearchResponse(results=results, total=len(results))
+    results = await _run_db(search_by_tag, tag, agent_id=agent_id, limit=limit)
+    return _search_page(results)
 
 
 # ── Relation endpoints ───────────────────────────────────────────────────────
 
 
 @app.post("/memories/{memory_id}/relations", response_model=RelationResponse, status_code=201)
-def relation_add(
+async def relation_add(
     memory_id: int,
     req: RelationRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> RelationResponse:
     """Create a relation between two memories."""
-    add_relation(memory_id, req.target_id, req.relation, agent_id=agent_id)
-    relations = get_relations(memory_id, agent_id=agent_id)
+    _, relations = await _run_db(add_relation_returning, memory_id, req.target_id, req.relation, agent_id=agent_id)
     return RelationResponse(relations=relations, total=len(relations))
 
 
 @app.get("/memories/{memory_id}/relations", response_model=RelationResponse)
-def relation_list(
+async def relation_list(
     memory_id: int,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> RelationResponse:
     """Return the relations of a memory."""
-    relations = get_relations(memory_id, agent_id=agent_id)
+    relations = await _run_db(get_relations, memory_id, agent_id=agent_id)
     return RelationResponse(relations=relations, total=len(relations))
 
 
 # ── Maintenance endpoints ─────────────────────────────────────────────────────
 
+# Background jobs (opt-in with ?background=true): the request returns 202 + job id
+# immediately, the pass runs after the response and is polled via GET /jobs/{job_id}.
+_JOBS_MAX = 1000  # most recent jobs kept for polling; oldest evicted first
+_jobs: OrderedDict[str, dict] = OrderedDict()
+_jobs_lock = _rl_threading.Lock()
+# (agent_id, kind) -> job still queued or running: a repeated request returns it instead of queueing another
+_active_jobs: dict[tuple[str, str], dict] = {}
+# agent_id -> [lock, holders + waiters]; the entry is dropped when nobody uses it anymore
+_agent_pass_locks: dict[str, list] = {}
+
+
+@contextmanager
+def _agent_pass(agent_id: str) -> Iterator[None]:
+    """Serialize maintenance passes per agent, synchronous or background alike."""
+    with _jobs_lock:
+        entry = _agent_pass_locks.get(agent_id)
+        if entry is None:
+            entry = _agent_pass_locks[agent_id] = [_rl_threading.Lock(), 0]
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _jobs_lock:
+            entry[1] -= 1
+            if not entry[1]:
+                del _agent_pass_locks[agent_id]
 
-@app.post("/decay/run", response_model=DecayRunResponse)
-def decay_run(
-    request: Request,
-    _: str = _Auth,
-    agent_id: str = _Agent,
-) -> DecayRunResponse:
-    """Recalculate decay scores for agent's memories."""
-    _check_rate_limit(_get_client_ip(request), "/decay/run")
-    updated = run_decay_pass(agent_id=agent_id)
-    return DecayRunResponse(updated=updated)
 
+def _run_pass(work, agent_id: str):
+    """Synchronous maintenance pass: waits for any background pass of the same agent."""
+    with _agent_pass(agent_id):
+        return work(agent_id)
 
-@app.post("/compress", response_model=CompressRunResponse)
-def compress(
-    request: Request,
-    _: str = _Auth,
-    agent_id: str = _Agent,
-) -> CompressRunResponse:
-    """Merge similar memories for this agent."""
-    _check_rate_limit(_get_client_ip(request), "/compress")
-    from .compressor import run_compression
 
+def _run_job(job: dict, work, agent_id: str) -> None:
+    try:
+        with _agent_pass(agent_id):
+            job["status"] = "running"
+            try:
+                job["result"] = work(agent_id).model_dump()
+                job["status"] = "done"
+            except Exception:
+                logger.exception("Background job %s (%s) failed", job["job_id"], job["kind"])
+                job["error"] = "Internal server error"
+                job["status"] = "failed"
+    finally:
+        with _jobs_lock:
+            _active_jobs.pop((agent_id, job["kind"]), None)
+
+
+def _job_response(job: dict) -> JobResponse:
+    return JobResponse(**{k: v for k, v in job.items() if k != "agent_id"})
+
+
+def _enqueue_job(background_tasks: BackgroundTasks, kind: str, work, agent_id: str) -> JSONResponse:
+    with _jobs_lock:
+        job = _active_jobs.get((agent_id, kind))
+        if job is not None:
+            # Same pass already pending for this agent: at most one thread per (agent, kind)
+            return FastJSONResponse(status_code=202, content=_job_response(job).model_dump())
+        # All keys present up front: the worker thread only replaces values while pollers read
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "agent_id": agent_id,
+            "status": "queued",
+            "result": None,
+            "error": None,
+        }
+        _active_jobs[(agent_id, kind)] = job
+        _jobs[job["job_id"]] = job
+        while len(_jobs) > _JOBS_MAX:
+            _jobs.popitem(last=False)
+    background_tasks.add_task(_run_job, job, work, agent_id)
+    return FastJSONResponse(status_code=202, content=_job_response(job).model_dump())
+
+
+def _decay_work(agent_id: str) -> DecayRunResponse:
+    return DecayRunResponse(updated=run_decay_pass(agent_id=agent_id))
+
+
+def _compress_work(agent_id: str) -> CompressRunResponse:
     result = run_compression(agent_id=agent_id)
     return CompressRunResponse(
         clusters_found=result.clusters_found,
@@ -544,59 +904,118 @@ def compress(
     )
 
 
-@app.post("/cleanup", response_model=CleanupExpiredResponse)
+def _cleanup_work(agent_id: str) -> CleanupExpiredResponse:
+    return CleanupExpiredResponse(removed=cleanup_expired(agent_id=agent_id))
+
+
+def _auto_tune_work(agent_id: str) -> AutoTuneResponse:
+    return AutoTuneResponse(**run_auto_tune(agent_id=agent_id))
+
+
+_Background = Query(False, description="Run as a background job: returns 202 with a job id to poll at /jobs/{job_id}")
+_JOB_ACCEPTED = {202: {"model": JobResponse}}
+
+
+@app.post("/decay/run", response_model=DecayRunResponse, responses=_JOB_ACCEPTED)
+def decay_run(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    background: bool = _Background,
+    agent_id: str = _AuthAgent,
+) -> DecayRunResponse | JSONResponse:
+    """Recalculate decay scores for agent's memories."""
+    _enforce_rate_limit(request)
+    if background:
+        return _enqueue_job(background_tasks, "decay", _decay_work, agent_id)
+    return _run_pass(_decay_work, agent_id)
+
+
+@app.post("/compress", response_model=CompressRunResponse, responses=_JOB_ACCEPTED)
+def compress(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    background: bool = _Background,
+    agent_id: str = _AuthAgent,
+) -> CompressRunResponse | JSONResponse:
+    """Merge similar memories for this agent."""
+    _enforce_rate_limit(request)
+    if background:
+        return _enqueue_job(background_tasks, "compress", _compress_work, agent_id)
+    return _run_pass(_compress_work, agent_id)
+
+
+@app.post("/cleanup", response_model=CleanupExpiredResponse, responses=_JOB_ACCEPTED)
 def cleanup(
-    _: str = _Auth,
-    agent_id: str = _Agent,
-) -> CleanupExpiredResponse:
+    background_tasks: BackgroundTasks,
+    background: bool = _Background,
+    agent_id: str = _AuthAgent,
+) -> CleanupExpiredResponse | JSONResponse:
     """Remove expired memories (elapsed TTL) for this agent."""
-    removed = cleanup_expired(agent_id=agent_id)
-    return CleanupExpiredResponse(removed=removed)
+    if background:
+        return _enqueue_job(background_tasks, "cleanup", _cleanup_work, agent_id)
+    return _run_pass(_cleanup_work, agent_id)
 
 
-@app.post("/auto-tune", response_model=AutoTuneResponse)
+@app.post("/auto-tune", response_model=AutoTuneResponse, responses=_JOB_ACCEPTED)
 def auto_tune(
     request: Request,
-    _: str = _Auth,
-    agent_id: str = _Agent,
-) -> AutoTuneResponse:
+    background_tasks: BackgroundTasks,
+    background: bool = _Background,
+    agent_id: str = _AuthAgent,
+) -> AutoTuneResponse | JSONResponse:
     """Auto-tune memory importance based on access patterns."""
-    _check_rate_limit(_get_client_ip(request), "/decay/run")  # share decay rate limit
-    from .auto_tuner import run_auto_tune
+    _enforce_rate_limit(request)
+    if background:
+        return _enqueue_job(background_tasks, "auto-tune", _auto_tune_work, agent_id)
+    return _run_pass(_auto_tune_work, agent_id)
+
 
-    result = run_auto_tune(agent_id=agent_id)
-    return AutoTuneResponse(**result)
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+def job_status(
+    job_id: str,
+    agent_id: str = _AuthAgent,
+) -> JobResponse:
+    """Status and result of a background maintenance job. Agents only see their own jobs."""
+    job = _jobs.get(job_id)
+    if job is None or job["agent_id"] != agent_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
 
 
 @app.get("/stats/scoring", response_model=ScoringStatsResponse)
-def scoring_stats(
-    _: str = _Auth,
-    agent_id: str = _Agent,
+async def scoring_stats(
+    agent_id: str = _AuthAgent,
 ) -> ScoringStatsResponse:
     """Return importance scoring statistics for the agent's memories."""
-    from .auto_tuner import get_scoring_stats
-
-    return ScoringStatsResponse(**get_scoring_stats(agent_id=agent_id))
+    return ScoringStatsResponse(**await _run_db(get_scoring_stats, agent_id=agent_id))
 
 
 # ── Backup / Import ──────────────────────────────────────────────────────────
 
 
-@app.get("/export", response_model=MemoryExportResponse)
-def export(
-    _: str = _Auth,
-    agent_id: str = _Agent,
-) -> MemoryExportResponse:
-    """Export all active memories for the agent (without embeddings)."""
-    data = export_memories(agent_id=agent_id)
-    return MemoryExportResponse(memories=data, total=len(data))
+@app.get("/export", response_class=StreamingResponse, responses={200: {"model": MemoryExportResponse}})
+async def export(
+    agent_id: str = _AuthAgent,
+) -> StreamingResponse:
+    """Export all active memories for the agent (without embeddings), streamed in chunks."""
+    return StreamingResponse(_export_stream(agent_id), media_type="application/json")
+
+
+def _export_stream(agent_id: str) -> Iterator[bytes]:
+    # Same shape as MemoryExportResponse, written chunk by chunk: peak memory is one chunk
+    total = 0
+    yield b'{"memories":['
+    for chunk in iter_export_memories(agent_id=agent_id):
+        body = _json_dumps(chunk)[1:-1].encode("utf-8")
+        yield body if not total else b"," + body
+        total += len(chunk)
+    yield b'],"total":%d}' % total
 
 
 @app.post("/import", response_model=MemoryImportResponse, status_code=201)
 def import_data(
     req: MemoryImportRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> MemoryImportResponse:
     """Import memories from a previous export."""
     count = import_memories(req.memories, agent_id=agent_id)
@@ -607,96 +1026,93 @@ def import_data(
 
 
 @app.post("/memories/{memory_id}/archive", response_model=ArchiveResponse, status_code=200)
-def archive(memory_id: int, _: str = _Auth, agent_id: str = _Agent) -> ArchiveResponse:
-    if not archive_memory(memory_id, agent_id=agent_id):
+async def archive(memory_id: int, agent_id: str = _AuthAgent) -> ArchiveResponse:
+    if not await _run_db(archive_memory, memory_id, agent_id=agent_id):
         raise HTTPException(404, "Memory not found or already archived")
     return ArchiveResponse(success=True, message="Memory archived")
 
 
 @app.post("/memories/{memory_id}/restore", response_model=ArchiveResponse, status_code=200)
-def restore(memory_id: int, _: str = _Auth, agent_id: str = _Agent) -> ArchiveResponse:
-    if not restore_memory(memory_id, agent_id=agent_id):
+async def restore(memory_id: int, agent_id: str = _AuthAgent) -> ArchiveResponse:
+    if not await _run_db(restore_memory, memory_id, agent_id=agent_id):
         raise HTTPException(404, "Memory not found or not archived")
     return ArchiveResponse(success=True, message="Memory restored")
 
 
 @app.get("/archive", response_model=MemorySearchResponse)
-def archive_list(limit: int = Query(50, ge=1, le=100), _: str = _Auth, agent_id: str = _Agent) -> MemorySearchResponse:
-    results = get_archived(agent_id=agent_id, limit=limit)
-    return MemorySearchResponse(results=results, total=len(results))
+async def archive_list(
+    limit: int = Query(50, ge=1, le=100),
+    agent_id: str = _AuthAgent,
+) -> MemorySearchResponse:
+    results = await _run_db(get_archived, agent_id=agent_id, limit=limit)
+    return _search_page(results)
 
 
 # ── Session endpoints ─────────────────────────────────────────────────────────
 
 
 @app.post("/sessions", response_model=SessionResponse, status_code=201)
-def session_create(
+async def session_create(
     req: SessionCreateRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> SessionResponse:
     """Create a new conversation session."""
-    result = create_session(req.session_id, agent_id=agent_id, title=req.title)
+    result = await _run_db(create_session, req.session_id, agent_id=agent_id, title=req.title)
     if not result:
         raise HTTPException(400, "Failed to create session")
     return SessionResponse(**result, memory_count=0)
 
 
 @app.get("/sessions", response_model=list[SessionResponse])
-def sessions_list(
+async def sessions_list(
     limit: int = Query(50, ge=1, le=200),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> list[SessionResponse]:
     """List all sessions for the requesting agent."""
-    rows = list_sessions(agent_id=agent_id, limit=limit)
+    rows = await _run_db(list_sessions, agent_id=agent_id, limit=limit)
     return [SessionResponse(**r) for r in rows]
 
 
 @app.get("/sessions/{session_id}/memories", response_model=MemorySearchResponse)
-def session_memories(
+async def session_memories(
     session_id: str,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> MemorySearchResponse:
     """Get all memories in a session."""
-    results = get_session_memories(session_id, agent_id=agent_id)
-    return MemorySearchResponse(results=results, total=len(results))
+    results = await _run_db(get_session_memories, session_id, agent_id=agent_id)
+    return _search_page(results)
 
 
 @app.get("/sessions/{session_id}/summary", response_model=SessionSummaryResponse)
-def session_summary(
+async def session_summary(
     session_id: str,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> SessionSummaryResponse:
     """Get aggregated summary of a session (no LLM)."""
-    summary = get_session_summary(session_id, agent_id=agent_id)
+    summary = await _run_db(get_session_summary, session_id, agent_id=agent_id)
     if not summary:
         raise HTTPException(404, "Session not found")
     return SessionSummaryResponse(**summary)
 
 
 @app.post("/sessions/{session_id}/end", response_model=ArchiveResponse)
-def session_end(
+async def session_end(
     session_id: str,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> ArchiveResponse:
     """Mark a session as ended."""
-    if not end_session(session_id, agent_id=agent_id):
+    if not await _run_db(end_session, session_id, agent_id=agent_id):
         raise HTTPException(404, "Session not found or already ended")
     return ArchiveResponse(success=True, message="Session ended")
 
 
 @app.delete("/sessions/{session_id}", response_model=SessionDeleteResponse, status_code=200)
-def session_delete(
+async def session_delete(
     session_id: str,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> SessionDeleteResponse:
     """Delete a session. Memories are unlinked but not deleted."""
-    unlinked = delete_session(session_id, agent_id=agent_id)
+    unlinked = await _run_db(delete_session, session_id, agent_id=agent_id)
     return SessionDeleteResponse(success=True, unlinked_memories=unlinked)
 
 
@@ -710,12 +1126,9 @@ def entities_list(
         description="Filter by entity type (person, org, email, url, date, money, location, product)",
     ),
     limit: int = Query(50, ge=1, le=200),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> EntityListResponse:
     """List extracted entities from memory tags. Requires KORE_ENTITY_EXTRACTION=1."""
-    from .integrations.entities import search_entities
-
     results = search_entities(agent_id, entity_type=type, limit=limit)
     return EntityListResponse(
         entities=[EntityRecord(**r) for r in results],
@@ -731,8 +1144,7 @@ def graph_traverse(
     start_id: int = Query(..., description="Starting memory ID"),
     depth: int = Query(3, ge=1, le=10, description="Max traversal depth"),
     relation_type: str | None = Query(None, description="Filter by relation type"),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> GraphTraverseResponse:
     """Multi-hop graph traversal using recursive CTE. Returns connected memories up to N hops."""
     result = traverse_graph(start_id, agent_id=agent_id, depth=depth, relation_type=relation_type)
@@ -747,12 +1159,9 @@ def summarize(
     topic: str = Query(..., min_length=1, description="Topic to summarize"),
     limit: int = Query(50, ge=1, le=200),
     top_keywords: int = Query(10, ge=1, le=50),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> SummarizeResponse:
     """Summarize memories about a topic using TF-IDF keyword extraction (no LLM)."""
-    from .summarizer import summarize_topic
-
     result = summarize_topic(topic, agent_id=agent_id, limit=limit, top_keywords=top_keywords)
     return SummarizeResponse(**result)
 
@@ -764,12 +1173,9 @@ def summarize(
 def acl_grant(
     memory_id: int,
     req: ACLGrantRequest,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> ACLResponse:
     """Grant access to a memory for another agent. Only owner or admin can grant."""
-    from .acl import grant_access, list_permissions
-
     success = grant_access(memory_id, req.target_agent, req.permission, grantor_agent=agent_id)
     if not success:
         raise HTTPException(403, "Not authorized to grant access or memory not found")
@@ -781,12 +1187,9 @@ def acl_grant(
 def acl_revoke(
     memory_id: int,
     target_agent: str,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> ACLResponse:
     """Revoke access for an agent. Only owner or admin can revoke."""
-    from .acl import list_permissions, revoke_access
-
     success = revoke_access(memory_id, target_agent, grantor_agent=agent_id)
     if not success:
         raise HTTPException(403, "Not authorized to revoke access or no permission found")
@@ -797,12 +1200,9 @@ def acl_revoke(
 @app.get("/memories/{memory_id}/acl", response_model=ACLResponse)
 def acl_list(
     memory_id: int,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> ACLResponse:
     """List all permissions for a memory. Only visible to owner or admin."""
-    from .acl import list_permissions
-
     perms = list_permissions(memory_id, agent_id)
     return ACLResponse(success=True, permissions=perms)
 
@@ -810,12 +1210,9 @@ def acl_list(
 @app.get("/shared", response_model=SharedMemoriesResponse)
 def shared_memories(
     limit: int = Query(50, ge=1, le=200),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> SharedMemoriesResponse:
     """Get all memories shared with this agent by other agents."""
-    from .acl import get_shared_memories
-
     results = get_shared_memories(agent_id, limit=limit)
     return SharedMemoriesResponse(memories=results, total=len(results))
 
@@ -828,12 +1225,9 @@ async def stream_search(
     request: Request,
     q: str = Query(..., min_length=1, description="Search query"),
     limit: int = Query(10, ge=1, le=50),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> StreamingResponse:
     """Server-Sent Events streaming search. FTS5 results first, then semantic."""
-    import asyncio
-    import json
 
     async def event_stream():
         # Phase 1: FTS5 results (fast)
@@ -845,7 +1239,7 @@ async def stream_search(
             "total": fts_total,
             "phase": "fts",
         }
-        yield f"event: fts\ndata: {json.dumps(fts_data)}\n\n"
+        yield f"event: fts\ndata: {_json_dumps(fts_data)}\n\n"
 
         # Small delay to allow client to process FTS
         await asyncio.sleep(0.05)
@@ -863,10 +1257,10 @@ async def stream_search(
                 "total": sem_total,
                 "phase": "semantic",
             }
-            yield f"event: semantic\ndata: {json.dumps(sem_data)}\n\n"
+            yield f"event: semantic\ndata: {_json_dumps(sem_data)}\n\n"
         except Exception:
             err_data = {"results": [], "total": 0, "phase": "semantic", "error": "unavailable"}
-            yield f"event: semantic\ndata: {json.dumps(err_data)}\n\n"
+            yield f"event: semantic\ndata: {_json_dumps(err_data)}\n\n"
 
         # Done signal
         yield "event: done\ndata: {}\n\n"
@@ -883,12 +1277,9 @@ async def stream_search(
 
 @app.get("/analytics", response_model=AnalyticsResponse)
 def analytics(
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> AnalyticsResponse:
     """Comprehensive analytics: categories, decay, tags, access patterns, growth."""
-    from .analytics import get_analytics
-
     return AnalyticsResponse(**get_analytics(agent_id=agent_id))
 
 
@@ -898,16 +1289,13 @@ def analytics(
 @app.delete("/memories/agent/{target_agent}", response_model=GDPRDeleteResponse)
 def gdpr_delete_agent(
     target_agent: str,
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> GDPRDeleteResponse:
     """GDPR Article 17 — Right to erasure. Permanently deletes ALL data for an agent.
     The requesting agent must match the target agent (self-deletion only)."""
     if agent_id != target_agent:
         raise HTTPException(403, "Can only delete your own agent data")
 
-    from .database import get_connection
-
     with get_connection() as conn:
         # Count before deletion
         mem_count = conn.execute(
@@ -967,10 +1355,8 @@ def gdpr_delete_agent(
 
 
 @app.get("/plugins", response_model=PluginListResponse)
-def plugins_list(_: str = _Auth) -> PluginListResponse:
+async def plugins_list(_: str = _Auth) -> PluginListResponse:
     """List registered plugins."""
-    from .plugins import list_plugins
-
     names = list_plugins()
     return PluginListResponse(plugins=names, total=len(names))
 
@@ -979,9 +1365,9 @@ def plugins_list(_: str = _Auth) -> PluginListResponse:
 
 
 @app.get("/agents", response_model=AgentListResponse)
-def agents_list(_: str = _Auth) -> AgentListResponse:
+async def agents_list(_: str = _Auth) -> AgentListResponse:
     """List all agent IDs with memory count and last activity. No agent scoping — returns all agents."""
-    rows = list_agents()
+    rows = await _cached_db(list_agents)
     return AgentListResponse(
         agents=[AgentRecord(**r) for r in rows],
         total=len(rows),
@@ -991,27 +1377,33 @@ def agents_list(_: str = _Auth) -> AgentListResponse:
 # ── Metrics ───────────────────────────────────────────────────────────────────
 
 
+_METRICS_TMPL = (
+    b"# HELP kore_memories_total Total memory records\n"
+    b"# TYPE kore_memories_total gauge\n"
+    b"kore_memories_total %d\n"
+    b"# HELP kore_memories_active Active (non-decayed) memory records\n"
+    b"# TYPE kore_memories_active gauge\n"
+    b"kore_memories_active %d\n"
+    b"# HELP kore_memories_archived Archived memory records\n"
+    b"# TYPE kore_memories_archived gauge\n"
+    b"kore_memories_archived %d\n"
+    b"# HELP kore_db_size_bytes Database file size in bytes\n"
+    b"# TYPE kore_db_size_bytes gauge\n"
+    b"kore_db_size_bytes %d\n"
+)
+
+
 @app.get("/metrics", include_in_schema=False)
-def metrics(_: str = _Auth, agent_id: str = _Agent) -> Response:
+async def metrics(agent_id: str = _AuthAgent) -> Response:
     """Prometheus-compatible metrics endpoint."""
-    from .repository import get_stats
-
-    stats = get_stats(agent_id)
-    lines = [
-        "# HELP kore_memories_total Total memory records",
-        "# TYPE kore_memories_total gauge",
-        f"kore_memories_total {stats['total_memories']}",
-        "# HELP kore_memories_active Active (non-decayed) memory records",
-        "# TYPE kore_memories_active gauge",
-        f"kore_memories_active {stats['active_memories']}",
-        "# HELP kore_memories_archived Archived memory records",
-        "# TYPE kore_memories_archived gauge",
-        f"kore_memories_archived {stats['archived_memories']}",
-        "# HELP kore_db_size_bytes Database file size in bytes",
-        "# TYPE kore_db_size_bytes gauge",
-        f"kore_db_size_bytes {stats['db_size_bytes']}",
-    ]
-    return Response(content="\n".join(lines) + "\n", media_type="text/plain; charset=utf-8")
+    stats = await _cached_db(get_stats, agent_id)
+    body = _METRICS_TMPL % (
+        stats["total_memories"],
+        stats["active_memories"],
+        stats["archived_memories"],
+        stats["db_size_bytes"],
+    )
+    return Response(content=body, media_type="text/plain; charset=utf-8")
 
 
 # ── Audit log ────────────────────────────────────────────────────────────────
@@ -1023,12 +1415,9 @@ def audit_log(
     event: str | None = Query(None),
     limit: int = Query(100, ge=1, le=1000),
     since: str | None = Query(None, description="ISO datetime"),
-    _: str = _Auth,
-    agent_id: str = _Agent,
+    agent_id: str = _AuthAgent,
 ) -> AuditResponse:
     """Query the audit event log for the requesting agent."""
-    from .audit import query_audit_log
-
     entries = query_audit_log(agent_id, event_type=event, limit=limit, since=since)
     return AuditResponse(events=entries, total=len(entries))
 
@@ -1037,14 +1426,15 @@ def audit_log(
 
 
 @app.get("/favicon.svg", include_in_schema=False)
-async def favicon():
-    """Serve the SVG favicon."""
-    from pathlib import Path
-
-    svg_path = Path(__file__).parent.parent / "assets" / "favicon.svg"
-    if svg_path.exists():
-        return Response(content=svg_path.read_text(), media_type="image/svg+xml")
-    return Response(status_code=404)
+async def favicon(request: Request) -> Response:
+    """Serve the SVG favicon (read once at startup)."""
+    state = request.app.state
+    if not hasattr(state, "favicon"):
+        # Lifespan not run (e.g. app mounted without startup events)
+        state.favicon = _load_favicon()
+    if state.favicon is None:
+        return Response(status_code=404)
+    return Response(content=state.favicon, media_type="image/svg+xml")
 
 
 # ── Dashboard ─────────────────────────────────────────────────────────────────
@@ -1053,38 +1443,46 @@ async def favicon():
 @app.get("/dashboard", response_class=HTMLResponse, include_in_schema=False)
 async def dashboard(request: Request) -> HTMLResponse:
     """Web dashboard for memory management. Requires auth if not in local-only mode."""
-    from .auth import _is_local, _local_only_mode
-
     if not (_local_only_mode() and _is_local(request)):
         await require_auth(request, request.headers.get("X-Kore-Key"))
-    html = get_dashboard_html()
     # Inject CSP nonce
     nonce = getattr(request.state, "csp_nonce", "")
-    html = html.replace("<script>", f'<script nonce="{nonce}">')
-    return HTMLResponse(content=html)
+    return HTMLResponse(content=render_dashboard_html(nonce))
 
 
 # ── Utility ───────────────────────────────────────────────────────────────────
 
 
+# Probe storms (load balancers, k8s) hit /health every 1-2 s: reuse the last result briefly
+_HEALTH_TTL = 1.0
+_health_cache: tuple[float, dict] | None = None
+
+
+def _db_ping() -> None:
+    with get_connection() as conn:
+        conn.execute("SELECT 1").fetchone()
+
+
 @app.get("/health")
-def health() -> JSONResponse:
-    from .database import get_connection
-    from .repository import _embeddings_available
+async def health() -> JSONResponse:
+    global _health_cache
+    now = time.monotonic()
+    cached = _health_cache
+    if cached is not None and now - cached[0] < _HEALTH_TTL:
+        return FastJSONResponse(cached[1])
 
     # Verify DB connectivity
     db_ok = True
     try:
-        with get_connection() as conn:
-            conn.execute("SELECT 1").fetchone()
+        await _run_db(_db_ping)
     except Exception:
         db_ok = False
     status = "ok" if db_ok else "degraded"
-    return JSONResponse(
-        {
-            "status": status,
-            "version": app.version,
-            "semantic_search": _embeddings_available(),
-            "database": "connected" if db_ok else "error",
-        }
-    )
+    payload = {
+        "status": status,
+        "version": app.version,
+        "semantic_search": _embeddings_available(),
+        "database": "connected" if db_ok else "error",
+    }
+    _health_cache = (now, payload)
+    return FastJSONResponse(payload)
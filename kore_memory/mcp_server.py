@@ -11,13 +11,19 @@ Usage:
 
 from __future__ import annotations
 
-import re as _re
+import time
+from functools import lru_cache
+from operator import attrgetter
 
 from mcp.server.fastmcp import FastMCP
 
+from . import config
+from .compressor import run_compression
 from .database import init_db
+from .embedder import query_cache_stats
 from .models import MemorySaveRequest, MemoryUpdateRequest
 from .repository import (
+    _embeddings_available,
     add_relation,
     add_tags,
     cleanup_expired,
@@ -27,6 +33,7 @@ from .repository import (
     import_memories,
     run_decay_pass,
     save_memory,
+    save_memory_batch,
     search_by_tag,
     search_memories,
     update_memory,
@@ -40,15 +47,34 @@ mcp = FastMCP(
     json_response=True,
 )
 
-_SAFE_AGENT_RE = _re.compile(r"[^a-zA-Z0-9_\-]")
+# Tabella per str.translate: ogni byte ASCII fuori da [A-Za-z0-9_-] viene eliminato
+_AGENT_ALLOWED = frozenset(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-")
+_AGENT_DROP = {i: None for i in range(128) if i not in _AGENT_ALLOWED}
 
 
+@lru_cache(maxsize=128)  # agent ids are low-cardinality: most calls are cache hits
 def _sanitize_agent_id(agent_id: str) -> str:
     """Sanitize agent_id: only alphanumeric characters, dashes and underscores, max 64 chars."""
-    safe = _SAFE_AGENT_RE.sub("", agent_id)
+    # Fast path: plain ASCII alphanumeric ids ("default", "agent1") are already safe
+    if len(agent_id) <= 64 and agent_id.isascii() and agent_id.isalnum():
+        return agent_id
+    # encode/ignore scarta i caratteri non ASCII, translate quelli ASCII non ammessi
+    safe = agent_id.encode("ascii", "ignore").decode("ascii").translate(_AGENT_DROP)
     return (safe or "default")[:64]
 
 
+# Result projections: attributes fetched in C by attrgetter, created_at always last (str() per row)
+_SEARCH_FIELDS = ("id", "content", "category", "importance", "decay_score", "score", "created_at")
+_TIMELINE_FIELDS = ("id", "content", "category", "importance", "created_at")
+_TAG_FIELDS = ("id", "content", "category", "importance", "decay_score", "created_at")
+
+
+def _project(results: list, fields: tuple[str, ...]) -> list[dict]:
+    """Build one dict per record with the given fields; created_at (the last one) as str."""
+    get = attrgetter(*fields)
+    return [dict(zip(fields, (*row[:-1], str(row[-1])))) for row in map(get, results)]
+
+
 # ── Tools ────────────────────────────────────────────────────────────────────
 
 
@@ -90,18 +116,7 @@ def memory_search(
         agent_id=_sanitize_agent_id(agent_id),
     )
     return {
-        "results": [
-            {
-                "id": r.id,
-                "content": r.content,
-                "category": r.category,
-                "importance": r.importance,
-                "decay_score": r.decay_score,
-                "score": r.score,
-                "created_at": str(r.created_at),
-            }
-            for r in results
-        ],
+        "results": _project(results, _SEARCH_FIELDS),
         "total": total_count,
         "has_more": next_cursor is not None,
     }
@@ -123,16 +138,7 @@ def memory_timeline(
         agent_id=_sanitize_agent_id(agent_id),
     )
     return {
-        "results": [
-            {
-                "id": r.id,
-                "content": r.content,
-                "category": r.category,
-                "importance": r.importance,
-                "created_at": str(r.created_at),
-            }
-            for r in results
-        ],
+        "results": _project(results, _TIMELINE_FIELDS),
         "total": total_count,
         "has_more": next_cursor is not None,
     }
@@ -154,8 +160,6 @@ def memory_compress(agent_id: str = "default") -> dict:
     Compress similar memories by merging them into a single richer record.
     Reduces redundancy while preserving important information.
     """
-    from .compressor import run_compression
-
     result = run_compression(agent_id=_sanitize_agent_id(agent_id))
     return {
         "clusters_found": result.clusters_found,
@@ -205,7 +209,7 @@ def memory_update(
         category=category or None,
         importance=importance or None,
     )
-    updated = update_memory(memory_id, req, agent_id=_sanitize_agent_id(agent_id))
+    updated = update_memory(memory_id, req, agent_id=_sanitize_agent_id(agent_id)) is not None
     return {
         "success": updated,
         "message": "Memory updated" if updated else "Memory not found",
@@ -222,7 +226,7 @@ def memory_save_batch(
     Optional fields: category (default 'general'), importance (None=auto, 1-5=explicit).
     Maximum 100 memories per batch.
     """
-    saved = []
+    reqs = []
     errors = 0
     for mem in memories[:100]:
         content = mem.get("content", "")
@@ -230,15 +234,34 @@ def memory_save_batch(
             continue
         try:
             raw_imp = mem.get("importance")
-            req = MemorySaveRequest(
-                content=content,
-                category=mem.get("category", "general"),
-                importance=raw_imp if raw_imp and raw_imp >= 1 else None,
+            reqs.append(
+                MemorySaveRequest(
+                    content=content,
+                    category=mem.get("category", "general"),
+                    importance=raw_imp if raw_imp and raw_imp >= 1 else None,
+                )
             )
-            mem_id, imp = save_memory(req, agent_id=_sanitize_agent_id(agent_id))
-            saved.append({"id": mem_id, "importance": imp})
         except Exception:
             errors += 1
+    # Gli agenti ripetono spesso lo stesso item nel batch: salvato una volta, l'id è condiviso
+    unique: list[MemorySaveRequest] = []
+    slots: list[int] = []
+    seen: dict[tuple, int] = {}
+    for req in reqs:
+        key = (req.content, req.category, req.importance)
+        slot = seen.get(key)
+        if slot is None:
+            slot = seen[key] = len(unique)
+            unique.append(req)
+        slots.append(slot)
+    # Valid items are written in a single transaction with one batched embedding call
+    saved = []
+    if unique:
+        try:
+            results = save_memory_batch(unique, agent_id=_sanitize_agent_id(agent_id))
+            saved = [{"id": results[i][0], "importance": results[i][1]} for i in slots]
+        except Exception:
+            errors += len(reqs)
     return {"saved": saved, "total": len(saved), "errors": errors}
 
 
@@ -267,17 +290,7 @@ def memory_search_by_tag(
     """
     results = search_by_tag(tag, agent_id=_sanitize_agent_id(agent_id), limit=limit)
     return {
-        "results": [
-            {
-                "id": r.id,
-                "content": r.content,
-                "category": r.category,
-                "importance": r.importance,
-                "decay_score": r.decay_score,
-                "created_at": str(r.created_at),
-            }
-            for r in results
-        ],
+        "results": _project(results, _TAG_FIELDS),
         "total": len(results),
     }
 
@@ -326,13 +339,27 @@ def memory_import(
 # ── Resources ────────────────────────────────────────────────────────────────
 
 
+# Health pings are frequent and the answer barely changes: rebuild the string at most every few seconds
+_HEALTH_TTL = 5.0
+_health_status: tuple[float, str] | None = None
+
+
 @mcp.resource("kore://health")
 def health_resource() -> str:
     """Kore server health status."""
-    from . import config
-    from .repository import _embeddings_available
-
-    return f"Kore v{config.VERSION} — semantic_search={'enabled' if _embeddings_available() else 'disabled'}"
+    global _health_status
+    now = time.monotonic()
+    cached = _health_status
+    if cached is not None and now - cached[0] < _HEALTH_TTL:
+        return cached[1]
+
+    semantic = _embeddings_available()
+    status = f"Kore v{config.VERSION} — semantic_search={'enabled' if semantic else 'disabled'}"
+    if semantic:
+        stats = query_cache_stats()
+        status += f" — query_cache={stats['hits']} hits/{stats['misses']} misses"
+    _health_status = (now, status)
+    return status
 
 
 # ── Entry point ──────────────────────────────────────────────────────────────
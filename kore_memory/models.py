@@ -6,7 +6,7 @@ Request/response schemas with validation.
 from datetime import datetime
 from typing import Literal
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 Category = Literal[
     "general",
@@ -20,6 +20,12 @@ Category = Literal[
 ]
 
 
+class _Record(BaseModel):
+    """Base for server-built read-only records (search/semantic caches share instances across requests)."""
+
+    model_config = ConfigDict(frozen=True)
+
+
 class MemorySaveRequest(BaseModel):
     model_config = {
         "json_schema_extra": {
@@ -63,7 +69,7 @@ class MemoryUpdateRequest(BaseModel):
         return v.strip() if v else v
 
 
-class MemoryRecord(BaseModel):
+class MemoryRecord(_Record):
     model_config = {
         "json_schema_extra": {
             "examples": [
@@ -176,6 +182,16 @@ class AutoTuneResponse(BaseModel):
     message: str = "Auto-tune complete"
 
 
+class JobResponse(BaseModel):
+    """Status of a maintenance job started with ?background=true."""
+
+    job_id: str
+    kind: str
+    status: Literal["queued", "running", "done", "failed"]
+    result: dict | None = None
+    error: str | None = None
+
+
 class ScoringStatsResponse(BaseModel):
     total: int
     distribution: dict[str, int]  # importance level -> count
@@ -190,7 +206,7 @@ class SessionCreateRequest(BaseModel):
     title: str | None = Field(None, max_length=500)
 
 
-class SessionResponse(BaseModel):
+class SessionResponse(_Record):
     id: str
     agent_id: str
     title: str | None = None
@@ -217,7 +233,7 @@ class SessionDeleteResponse(BaseModel):
     unlinked_memories: int
 
 
-class EntityRecord(BaseModel):
+class EntityRecord(_Record):
     type: str
     value: str
     memory_id: int
@@ -229,7 +245,7 @@ class EntityListResponse(BaseModel):
     total: int
 
 
-class AgentRecord(BaseModel):
+class AgentRecord(_Record):
     agent_id: str
     memory_count: int
     last_active: str | None = None
@@ -240,7 +256,7 @@ class AgentListResponse(BaseModel):
     total: int
 
 
-class AuditEventRecord(BaseModel):
+class AuditEventRecord(_Record):
     id: int
     event: str
     agent_id: str
@@ -257,7 +273,7 @@ class AuditResponse(BaseModel):
 # ── Graph RAG ────────────────────────────────────────────────────────────────
 
 
-class GraphNodeRecord(BaseModel):
+class GraphNodeRecord(_Record):
     id: int
     content: str
     category: str
@@ -267,7 +283,7 @@ class GraphNodeRecord(BaseModel):
     hop: int
 
 
-class GraphEdgeRecord(BaseModel):
+class GraphEdgeRecord(_Record):
     source_id: int
     target_id: int
     relation: str
@@ -284,7 +300,7 @@ class GraphTraverseResponse(BaseModel):
 # ── Summarization ────────────────────────────────────────────────────────────
 
 
-class KeywordRecord(BaseModel):
+class KeywordRecord(_Record):
     word: str
     score: float
 
@@ -303,10 +319,10 @@ class SummarizeResponse(BaseModel):
 
 class ACLGrantRequest(BaseModel):
     target_agent: str = Field(..., min_length=1, max_length=64)
-    permission: str = Field("read", pattern=r"^(read|write|admin)$")
+    permission: Literal["read", "write", "admin"] = "read"
 
 
-class ACLRecord(BaseModel):
+class ACLRecord(_Record):
     agent_id: str
     permission: str
     granted_by: str
@@ -318,7 +334,7 @@ class ACLResponse(BaseModel):
     permissions: list[ACLRecord] = []
 
 
-class SharedMemoryRecord(BaseModel):
+class SharedMemoryRecord(_Record):
     id: int
     content: str
     category: str
@@ -7,7 +7,9 @@ Supports pre/post hooks for save, search, delete, and compress.
 from __future__ import annotations
 
 import logging
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from typing import Any
 
 logger = logging.getLogger("kore.plugins")
@@ -55,16 +57,42 @@ class KorePlugin(ABC):
 # Plugin registry
 _plugins: dict[str, KorePlugin] = {}
 
+_HOOKS = ("pre_save", "post_save", "pre_search", "post_search", "pre_delete", "post_delete")
+
+# Per hook: (plugin name, bound method) of the plugins that override it. Registry changes
+# (rare) rebuild a new dict under the lock and swap it in with one assignment, so dispatch
+# (hot) reads an immutable snapshot without locking.
+_chains: dict[str, tuple[tuple[str, Callable[..., Any]], ...]] = dict.fromkeys(_HOOKS, ())
+_registry_lock = threading.Lock()
+
+
+def _rebuild_chains() -> None:
+    """Rebuild the hook snapshot from _plugins. Caller holds _registry_lock."""
+    global _chains
+    chains: dict[str, list[tuple[str, Callable[..., Any]]]] = {hook: [] for hook in _HOOKS}
+    for name, plugin in _plugins.items():
+        for hook in _HOOKS:
+            method = getattr(plugin, hook)
+            if getattr(method, "__func__", None) is not getattr(KorePlugin, hook):
+                chains[hook].append((name, method))
+    _chains = {hook: tuple(fns) for hook, fns in chains.items()}
+
 
 def register_plugin(plugin: KorePlugin) -> None:
     """Register a plugin. Replaces existing plugin with same name."""
-    _plugins[plugin.name] = plugin
+    with _registry_lock:
+        _plugins[plugin.name] = plugin
+        _rebuild_chains()
     logger.info("Plugin registered: %s", plugin.name)
 
 
 def unregister_plugin(name: str) -> bool:
     """Unregister a plugin by name. Returns True if found."""
-    return _plugins.pop(name, None) is not None
+    with _registry_lock:
+        found = _plugins.pop(name, None) is not None
+        if found:
+            _rebuild_chains()
+    return found
 
 
 def list_plugins() -> list[str]:
@@ -74,7 +102,9 @@ def list_plugins() -> list[str]:
 
 def clear_plugins() -> None:
     """Remove all plugins (for testing)."""
-    _plugins.clear()
+    with _registry_lock:
+        _plugins.clear()
+        _rebuild_chains()
 
 
 # Hook dispatch functions
@@ -82,63 +112,63 @@ def clear_plugins() -> None:
 def run_pre_save(content: str, category: str, importance: int | None, agent_id: str) -> dict[str, Any]:
     """Run all pre_save hooks. Returns merged overrides."""
     overrides: dict[str, Any] = {}
-    for plugin in _plugins.values():
+    for name, hook in _chains["pre_save"]:
         try:
-            result = plugin.pre_save(content, category, importance, agent_id)
+            result = hook(content, category, importance, agent_id)
             if result:
                 overrides.update(result)
         except Exception:
-            logger.exception("Plugin %s pre_save error", plugin.name)
+            logger.exception("Plugin %s pre_save error", name)
     return overrides
 
 
 def run_post_save(memory_id: int, content: str, category: str, importance: int, agent_id: str) -> None:
     """Run all post_save hooks."""
-    for plugin in _plugins.values():
+    for name, hook in _chains["post_save"]:
         try:
-            plugin.post_save(memory_id, content, category, importance, agent_id)
+            hook(memory_id, content, category, importance, agent_id)
         except Exception:
-            logger.exception("Plugin %s post_save error", plugin.name)
+            logger.exception("Plugin %s post_save error", name)
 
 
 def run_pre_search(query: str, agent_id: str, semantic: bool) -> dict[str, Any]:
     """Run all pre_search hooks. Returns merged overrides."""
     overrides: dict[str, Any] = {}
-    for plugin in _plugins.values():
+    for name, hook in _chains["pre_search"]:
         try:
-            result = plugin.pre_search(query, agent_id, semantic)
+            result = hook(query, agent_id, semantic)
             if result:
                 overrides.update(result)
         except Exception:
-            logger.exception("Plugin %s pre_search error", plugin.name)
+            logger.exception("Plugin %s pre_search error", name)
     return overrides
 
 
 def run_post_search(query: str, results: list[dict], agent_id: str) -> list[dict]:
     """Run all post_search hooks. Each plugin can filter/reorder results."""
-    for plugin in _plugins.values():
+    for name, hook in _chains["post_search"]:
         try:
-            results = plugin.post_search(query, results, agent_id)
+            results = hook(query, results, agent_id)
         except Exception:
-            logger.exception("Plugin %s post_search error", plugin.name)
+            logger.exception("Plugin %s post_search error", name)
     return results
 
 
 def run_pre_delete(memory_id: int, agent_id: str) -> bool:
     """Run all pre_delete hooks. Returns False if any plugin blocks deletion."""
-    for plugin in _plugins.values():
+    for name, hook in _chains["pre_delete"]:
         try:
-            if not plugin.pre_delete(memory_id, agent_id):
+            if not hook(memory_id, agent_id):
                 return False
         except Exception:
-            logger.exception("Plugin %s pre_delete error", plugin.name)
+            logger.exception("Plugin %s pre_delete error", name)
     return True
 
 
 def run_post_delete(memory_id: int, agent_id: str) -> None:
     """Run all post_delete hooks."""
-    for plugin in _plugins.values():
+    for name, hook in _chains["post_delete"]:
         try:
-            plugin.post_delete(memory_id, agent_id)
+            hook(memory_id, agent_id)
         except Exception:
-            logger.exception("Plugin %s post_delete error", plugin.name)
+            logger.exception("Plugin %s post_delete error", name)
@@ -11,7 +11,17 @@ The monolithic repository.py has been split into:
 """
 
 # ruff: noqa: F401 — re-exports for backward compatibility
-from .graph import add_relation, add_tags, get_relations, get_tags, remove_tags, traverse_graph
+from .graph import (
+    add_relation,
+    add_relation_returning,
+    add_tags,
+    add_tags_returning,
+    get_relations,
+    get_tags,
+    remove_tags,
+    remove_tags_returning,
+    traverse_graph,
+)
 from .lifecycle import (
     _compress_lock,
     _decay_lock,
@@ -28,6 +38,7 @@ from .memory import (
     get_memory,
     get_stats,
     import_memories,
+    iter_export_memories,
     list_agents,
     save_memory,
     save_memory_batch,
@@ -59,6 +70,7 @@ __all__ = [
     "get_memory",
     "delete_memory",
     "export_memories",
+    "iter_export_memories",
     "import_memories",
     "get_stats",
     "list_agents",
@@ -79,9 +91,12 @@ __all__ = [
     "_compress_lock",
     # Graph
     "add_tags",
+    "add_tags_returning",
     "remove_tags",
+    "remove_tags_returning",
     "get_tags",
     "add_relation",
+    "add_relation_returning",
     "get_relations",
     "traverse_graph",
     # Sessions
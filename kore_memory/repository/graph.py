@@ -8,50 +8,93 @@ from __future__ import annotations
 from ..database import get_connection
 
 
+def _owns(conn, memory_id: int, agent_id: str) -> bool:
+    return (
+        conn.execute(
+            "SELECT id FROM memories WHERE id = ? AND agent_id = ?",
+            (memory_id, agent_id),
+        ).fetchone()
+        is not None
+    )
+
+
+def _insert_tags(conn, memory_id: int, tags: list[str]) -> int:
+    added = 0
+    for tag in tags:
+        tag = tag.strip().lower()[:100]
+        if not tag:
+            continue
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO memory_tags (memory_id, tag) VALUES (?, ?)",
+                (memory_id, tag),
+            )
+            added += 1
+        except Exception:
+            continue
+    return added
+
+
+def _delete_tags(conn, memory_id: int, tags: list[str]) -> int:
+    removed = 0
+    for tag in tags:
+        tag = tag.strip().lower()
+        cursor = conn.execute(
+            "DELETE FROM memory_tags WHERE memory_id = ? AND tag = ?",
+            (memory_id, tag),
+        )
+        removed += cursor.rowcount
+    return removed
+
+
+def _select_tags(conn, memory_id: int, agent_id: str) -> list[str]:
+    # JOIN with memories to verify ownership
+    rows = conn.execute(
+        """
+        SELECT mt.tag
+        FROM memory_tags mt
+        JOIN memories m ON mt.memory_id = m.id
+        WHERE mt.memory_id = ? AND m.agent_id = ?
+        ORDER BY mt.tag
+        """,
+        (memory_id, agent_id),
+    ).fetchall()
+    return [r["tag"] for r in rows]
+
+
 def add_tags(memory_id: int, tags: list[str], agent_id: str = "default") -> int:
     """Add tags to a memory. Returns the number of tags added."""
     # Verify that the memory belongs to the agent
     with get_connection() as conn:
-        row = conn.execute(
-            "SELECT id FROM memories WHERE id = ? AND agent_id = ?",
-            (memory_id, agent_id),
-        ).fetchone()
-        if not row:
+        if not _owns(conn, memory_id, agent_id):
             return 0
-        added = 0
-        for tag in tags:
-            tag = tag.strip().lower()[:100]
-            if not tag:
-                continue
-            try:
-                conn.execute(
-                    "INSERT OR IGNORE INTO memory_tags (memory_id, tag) VALUES (?, ?)",
-                    (memory_id, tag),
-                )
-                added += 1
-            except Exception:
-                continue
-    return added
+        return _insert_tags(conn, memory_id, tags)
+
+
+def add_tags_returning(memory_id: int, tags: list[str], agent_id: str = "default") -> tuple[int, list[str]]:
+    """add_tags + get_tags on a single connection and transaction. Returns (added, current tags)."""
+    with get_connection() as conn:
+        if not _owns(conn, memory_id, agent_id):
+            return 0, []
+        added = _insert_tags(conn, memory_id, tags)
+        return added, _select_tags(conn, memory_id, agent_id)
 
 
 def remove_tags(memory_id: int, tags: list[str], agent_id: str = "default") -> int:
     """Remove tags from a memory. Returns the number of tags removed."""
     with get_connection() as conn:
-        row = conn.execute(
-            "SELECT id FROM memories WHERE id = ? AND agent_id = ?",
-            (memory_id, agent_id),
-        ).fetchone()
-        if not row:
+        if not _owns(conn, memory_id, agent_id):
             return 0
-        removed = 0
-        for tag in tags:
-            tag = tag.strip().lower()
-            cursor = conn.execute(
-                "DELETE FROM memory_tags WHERE memory_id = ? AND tag = ?",
-                (memory_id, tag),
-            )
-            removed += cursor.rowcount
-    return removed
+        return _delete_tags(conn, memory_id, tags)
+
+
+def remove_tags_returning(memory_id: int, tags: list[str], agent_id: str = "default") -> tuple[int, list[str]]:
+    """remove_tags + get_tags on a single connection and transaction. Returns (removed, remaining tags)."""
+    with get_connection() as conn:
+        if not _owns(conn, memory_id, agent_id):
+            return 0, []
+        removed = _delete_tags(conn, memory_id, tags)
+        return removed, _select_tags(conn, memory_id, agent_id)
 
 
 def get_tags(memory_id: int, agent_id: str = "default") -> list[str]:
@@ -60,59 +103,65 @@ def get_tags(memory_id: int, agent_id: str = "default") -> list[str]:
     Verifies that the memory belongs to the specified agent_id.
     """
     with get_connection() as conn:
-        # JOIN with memories to verify ownership
-        rows = conn.execute(
-            """
-            SELECT mt.tag
-            FROM memory_tags mt
-            JOIN memories m ON mt.memory_id = m.id
-            WHERE mt.memory_id = ? AND m.agent_id = ?
-            ORDER BY mt.tag
-            """,
-            (memory_id, agent_id),
-        ).fetchall()
-    return [r["tag"] for r in rows]
+        return _select_tags(conn, memory_id, agent_id)
+
+
+def _insert_relation(conn, source_id: int, target_id: int, relation: str, agent_id: str) -> bool:
+    # Verify that both memories belong to the agent
+    count = conn.execute(
+        "SELECT COUNT(*) FROM memories WHERE id IN (?, ?) AND agent_id = ?",
+        (source_id, target_id, agent_id),
+    ).fetchone()[0]
+    if count < 2:
+        return False
+    try:
+        conn.execute(
+            """INSERT OR IGNORE INTO memory_relations (source_id, target_id, relation)
+               VALUES (?, ?, ?)""",
+            (source_id, target_id, relation.strip().lower()[:100]),
+        )
+        return True
+    except Exception:
+        return False
+
+
+def _select_relations(conn, memory_id: int, agent_id: str) -> list[dict]:
+    rows = conn.execute(
+        """
+        SELECT r.source_id, r.target_id, r.relation, r.created_at,
+               m.content AS related_content
+        FROM memory_relations r
+        JOIN memories m ON m.id = CASE
+            WHEN r.source_id = ? THEN r.target_id
+            ELSE r.source_id
+        END
+        WHERE (r.source_id = ? OR r.target_id = ?) AND m.agent_id = ?
+        ORDER BY r.created_at DESC
+        """,
+        (memory_id, memory_id, memory_id, agent_id),
+    ).fetchall()
+    return [dict(r) for r in rows]
 
 
 def add_relation(source_id: int, target_id: int, relation: str = "related", agent_id: str = "default") -> bool:
     """Create a relation between two memories. Both must belong to the agent."""
     with get_connection() as conn:
-        # Verify that both memories belong to the agent
-        count = conn.execute(
-            "SELECT COUNT(*) FROM memories WHERE id IN (?, ?) AND agent_id = ?",
-            (source_id, target_id, agent_id),
-        ).fetchone()[0]
-        if count < 2:
-            return False
-        try:
-            conn.execute(
-                """INSERT OR IGNORE INTO memory_relations (source_id, target_id, relation)
-                   VALUES (?, ?, ?)""",
-                (source_id, target_id, relation.strip().lower()[:100]),
-            )
-            return True
-        except Exception:
-            return False
+        return _insert_relation(conn, source_id, target_id, relation, agent_id)
+
+
+def add_relation_returning(
+    source_id: int, target_id: int, relation: str = "related", agent_id: str = "default"
+) -> tuple[bool, list[dict]]:
+    """add_relation + get_relations(source_id) on a single connection. Returns (created, relations)."""
+    with get_connection() as conn:
+        created = _insert_relation(conn, source_id, target_id, relation, agent_id)
+        return created, _select_relations(conn, source_id, agent_id)
 
 
 def get_relations(memory_id: int, agent_id: str = "default") -> list[dict]:
     """Return all relations of a memory (in both directions)."""
     with get_connection() as conn:
-        rows = conn.execute(
-            """
-            SELECT r.source_id, r.target_id, r.relation, r.created_at,
-                   m.content AS related_content
-            FROM memory_relations r
-            JOIN memories m ON m.id = CASE
-                WHEN r.source_id = ? THEN r.target_id
-                ELSE r.source_id
-            END
-            WHERE (r.source_id = ? OR r.target_id = ?) AND m.agent_id = ?
-            ORDER BY r.created_at DESC
-            """,
-            (memory_id, memory_id, memory_id, agent_id),
-        ).fetchall()
-    return [dict(r) for r in rows]
+        return _select_relations(conn, memory_id, agent_id)
 
 
 def traverse_graph(
@@ -10,14 +10,17 @@ from datetime import UTC, datetime
 
 from ..database import get_connection
 from ..decay import compute_decay
-from ..events import MEMORY_ARCHIVED, MEMORY_DECAYED, MEMORY_RESTORED, emit
+from ..events import MEMORY_ARCHIVED, MEMORY_DECAYED, MEMORY_RESTORED, bump, emit
 from ..models import MemoryRecord
+from ..vector_index import get_index
 from .search import _row_to_record
 
 # Lock for maintenance operations — prevents concurrent runs
 _decay_lock = threading.Lock()
 _compress_lock = threading.Lock()
 
+_DECAY_CHUNK = 5000  # id span per transaction in the decay pass
+
 
 def cleanup_expired(agent_id: str | None = None) -> int:
     """Delete memories with elapsed TTL. Returns the number of records removed."""
@@ -27,8 +30,15 @@ def cleanup_expired(agent_id: str | None = None) -> int:
         if agent_id:
             sql += " AND agent_id = ?"
             params.append(agent_id)
-        cursor = conn.execute(sql, params)
-        return cursor.rowcount
+        removed = conn.execute(sql, params).rowcount
+    if removed:
+        bump(agent_id)  # nessun evento per riga, ma le cache per agente vanno invalidate
+        index = get_index()
+        if agent_id:
+            index.invalidate(agent_id)
+        else:
+            index.invalidate_all()
+    return removed
 
 
 def run_decay_pass(agent_id: str | None = None) -> int:
@@ -49,37 +59,40 @@ def run_decay_pass(agent_id: str | None = None) -> int:
 
 
 def _run_decay_pass_inner(agent_id: str | None = None) -> int:
+    # Un solo istante di riferimento per tutto il pass: niente datetime.now() per riga
+    now_dt = datetime.now(UTC)
+
+    def _decay(importance: int, created_at: str, last_accessed: str | None, access_count: int) -> float:
+        return compute_decay(importance, created_at, last_accessed, access_count, now=now_dt)
+
+    live = "compressed_into IS NULL AND archived_at IS NULL"
+    params: dict = {"now": now_dt.isoformat()}
+    if agent_id:
+        live += " AND agent_id = :agent_id"
+        params["agent_id"] = agent_id
+    sql = (
+        "UPDATE memories SET decay_score = kore_decay(importance, created_at, last_accessed, access_count),"
+        f" updated_at = :now WHERE id BETWEEN :lo AND :hi AND {live}"
+    )
+
+    # Il calcolo gira dentro l'UPDATE (nessun round-trip di righe verso Python);
+    # un commit per intervallo di id: il WAL può fare checkpoint tra un chunk e l'altro
+    updated = 0
     with get_connection() as conn:
-        sql = (
-            "SELECT id, importance, created_at, last_accessed, access_count"
-            " FROM memories WHERE compressed_into IS NULL AND archived_at IS NULL"
-        )
-        params: list = []
-        if agent_id:
-            sql += " AND agent_id = ?"
-            params.append(agent_id)
-        rows = conn.execute(sql, params).fetchall()
-
-    now = datetime.now(UTC).isoformat()
-    updates = []
-    for row in rows:
-        new_score = compute_decay(
-            importance=row["importance"],
-            created_at=row["created_at"],
-            last_accessed=row["last_accessed"],
-            access_count=row["access_count"],
-        )
-        updates.append((new_score, now, row["id"]))
+        first_id, last_id = conn.execute(f"SELECT MIN(id), MAX(id) FROM memories WHERE {live}", params).fetchone()
+        if first_id is not None:
+            conn.create_function("kore_decay", 4, _decay, deterministic=True)
+            try:
+                for lo in range(first_id, last_id + 1, _DECAY_CHUNK):
+                    updated += conn.execute(sql, {**params, "lo": lo, "hi": lo + _DECAY_CHUNK - 1}).rowcount
+                    conn.commit()
+            finally:
+                conn.create_function("kore_decay", 4, None)  # la connessione torna al pool senza la closure
 
-    if updates:
-        with get_connection() as conn:
-            conn.executemany(
-                "UPDATE memories SET decay_score = ?, updated_at = ? WHERE id = ?",
-                updates,
-            )
-        emit(MEMORY_DECAYED, {"agent_id": agent_id or "all", "updated": len(updates)})
+    if updated:
+        emit(MEMORY_DECAYED, {"agent_id": agent_id or "all", "updated": updated})
 
-    return len(updates)
+    return updated
 
 
 def archive_memory(memory_id: int, agent_id: str = "default") -> bool:
@@ -92,6 +105,7 @@ def archive_memory(memory_id: int, agent_id: str = "default") -> bool:
         archived = cursor.rowcount > 0
 
     if archived:
+        get_index().invalidate(agent_id)
         emit(MEMORY_ARCHIVED, {"id": memory_id, "agent_id": agent_id})
 
     return archived
@@ -107,6 +121,7 @@ def restore_memory(memory_id: int, agent_id: str = "default") -> bool:
         restored = cursor.rowcount > 0
 
     if restored:
+        get_index().invalidate(agent_id)
         emit(MEMORY_RESTORED, {"id": memory_id, "agent_id": agent_id})
 
     return restored
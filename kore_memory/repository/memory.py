@@ -6,12 +6,16 @@ Save, get, update, delete, batch save, import/export.
 from __future__ import annotations
 
 import os
+from collections.abc import Iterator
 from datetime import UTC, datetime, timedelta
 
-from ..database import _get_db_path, get_connection
+from .. import config
+from ..database import _get_db_path, get_connection, note_inserts
+from ..embedder import deserialize, embed, embed_batch, serialize, serialize_batch
 from ..events import MEMORY_DELETED, MEMORY_SAVED, MEMORY_UPDATED, emit
 from ..models import MemoryRecord, MemorySaveRequest, MemoryUpdateRequest
 from ..scorer import auto_score
+from ..vector_index import get_index, has_sqlite_vec
 
 _EMBEDDINGS_AVAILABLE: bool | None = None
 
@@ -40,8 +44,6 @@ def save_memory(req: MemorySaveRequest, agent_id: str = "default", session_id: s
 
     embedding_blob = None
     if _embeddings_available():
-        from ..embedder import embed, serialize
-
         try:
             embedding_blob = serialize(embed(req.content))
         except Exception:
@@ -76,16 +78,13 @@ def save_memory(req: MemorySaveRequest, agent_id: str = "default", session_id: s
             },
         )
         row_id = cursor.lastrowid
+    note_inserts(1)
 
     # Update vector index
     if embedding_blob:
-        from ..vector_index import get_index, has_sqlite_vec
-
         index = get_index()
         if has_sqlite_vec():
             # Insert into sqlite-vec native index
-            from ..embedder import deserialize
-
             try:
                 vec = deserialize(embedding_blob)
                 with get_connection() as conn:
@@ -98,9 +97,7 @@ def save_memory(req: MemorySaveRequest, agent_id: str = "default", session_id: s
     emit(MEMORY_SAVED, {"id": row_id, "agent_id": agent_id})
 
     # Entity extraction (optional, enabled via KORE_ENTITY_EXTRACTION=1)
-    from .. import config as _cfg
-
-    if _cfg.ENTITY_EXTRACTION:
+    if config.ENTITY_EXTRACTION:
         from ..integrations.entities import auto_tag_entities
 
         try:
@@ -114,7 +111,7 @@ def save_memory(req: MemorySaveRequest, agent_id: str = "default", session_id: s
 def save_memory_batch(reqs: list[MemorySaveRequest], agent_id: str = "default") -> list[tuple[int, int]]:
     """
     Batch save: single transaction, batch embeddings.
-    Returns list of (row_id, importance) tuples.
+    Returns list of (row_id, importance) tuples, one row per request.
     """
     if not reqs:
         return []
@@ -130,21 +127,21 @@ def save_memory_batch(reqs: list[MemorySaveRequest], agent_id: str = "default")
     # Batch embed all contents at once
     embeddings: list[str | None] = [None] * len(reqs)
     if _embeddings_available():
-        from ..embedder import embed_batch, serialize
-
         try:
             vectors = embed_batch([req.content for req in reqs])
-            embeddings = [serialize(v) for v in vectors]
+            embeddings = serialize_batch(vectors)
         except Exception:
             pass  # Fall back to no embeddings
 
     # Single transaction for all inserts
+    # Un solo "adesso" per tutto il batch: le scadenze restano coerenti tra gli elementi
+    now = datetime.now(UTC)
     results = []
     with get_connection() as conn:
         for i, req in enumerate(reqs):
             expires_at = None
             if req.ttl_hours:
-                expires_at = (datetime.now(UTC) + timedelta(hours=req.ttl_hours)).isoformat()
+                expires_at = (now + timedelta(hours=req.ttl_hours)).isoformat()
 
             cursor = conn.execute(
                 """INSERT INTO memories (agent_id, content, category, importance, embedding, expires_at)
@@ -159,6 +156,7 @@ def save_memory_batch(reqs: list[MemorySaveRequest], agent_id: str = "default")
                 },
             )
             results.append((cursor.lastrowid, importances[i]))
+    note_inserts(len(results))
 
     # Emit audit event for each saved memory
     for row_id, _ in results:
@@ -166,12 +164,8 @@ def save_memory_batch(reqs: list[MemorySaveRequest], agent_id: str = "default")
 
     # Update vector index
     if any(e is not None for e in embeddings):
-        from ..vector_index import get_index, has_sqlite_vec
-
         index = get_index()
         if has_sqlite_vec():
-            from ..embedder import deserialize
-
             with get_connection() as conn:
                 for i, emb in enumerate(embeddings):
                     if emb is not None:
@@ -183,14 +177,24 @@ def save_memory_batch(reqs: list[MemorySaveRequest], agent_id: str = "default")
         else:
             index.invalidate(agent_id)
 
+    # Entity extraction, same as save_memory (enabled via KORE_ENTITY_EXTRACTION=1)
+    if config.ENTITY_EXTRACTION:
+        from ..integrations.entities import auto_tag_entities
+
+        for (row_id, _), req in zip(results, reqs):
+            try:
+                auto_tag_entities(row_id, req.content, agent_id)
+            except Exception:
+                pass  # graceful degradation
+
     return results
 
 
-def update_memory(memory_id: int, req: MemoryUpdateRequest, agent_id: str = "default") -> bool:
+def update_memory(memory_id: int, req: MemoryUpdateRequest, agent_id: str = "default") -> int | None:
     """
     Update an existing memory atomically. Only provided fields are changed.
     Re-generates embedding if content changes.
-    Returns True if updated, False if not found.
+    Returns the stored importance after the update, None if not found.
     """
     updates = []
     params: list = []
@@ -200,8 +204,6 @@ def update_memory(memory_id: int, req: MemoryUpdateRequest, agent_id: str = "def
         params.append(req.content)
         # Regenerate embedding if content changes
         if _embeddings_available():
-            from ..embedder import embed, serialize
-
             try:
                 embedding_blob = serialize(embed(req.content))
                 updates.append("embedding = ?")
@@ -221,33 +223,31 @@ def update_memory(memory_id: int, req: MemoryUpdateRequest, agent_id: str = "def
         # Nothing to update — check if memory exists
         with get_connection() as conn:
             row = conn.execute(
-                "SELECT id FROM memories WHERE id = ? AND agent_id = ? AND compressed_into IS NULL",
+                "SELECT importance FROM memories WHERE id = ? AND agent_id = ? AND compressed_into IS NULL",
                 (memory_id, agent_id),
             ).fetchone()
-        return row is not None
+        return row["importance"] if row else None
 
     updates.append("updated_at = ?")
     params.append(datetime.now(UTC).isoformat())
     params.append(memory_id)
     params.append(agent_id)
 
-    # Single atomic UPDATE — no read-then-write race condition
+    # Single atomic UPDATE — no read-then-write race condition; RETURNING avoids a re-SELECT
     with get_connection() as conn:
-        cursor = conn.execute(
-            f"UPDATE memories SET {', '.join(updates)} WHERE id = ? AND agent_id = ? AND compressed_into IS NULL",
+        row = conn.execute(
+            f"UPDATE memories SET {', '.join(updates)} WHERE id = ? AND agent_id = ? AND compressed_into IS NULL "
+            "RETURNING importance",
             params,
-        )
-        if cursor.rowcount == 0:
-            return False
+        ).fetchone()
+        if row is None:
+            return None
+        importance = row["importance"]
 
     # Update vector index
     if req.content is not None:
-        from ..vector_index import get_index, has_sqlite_vec
-
         index = get_index()
         if has_sqlite_vec() and _embeddings_available():
-            from ..embedder import embed
-
             try:
                 vec = embed(req.content)
                 with get_connection() as conn:
@@ -258,7 +258,7 @@ def update_memory(memory_id: int, req: MemoryUpdateRequest, agent_id: str = "def
             index.invalidate(agent_id)
 
     emit(MEMORY_UPDATED, {"id": memory_id, "agent_id": agent_id})
-    return True
+    return importance
 
 
 def get_memory(memory_id: int, agent_id: str = "default") -> MemoryRecord | None:
@@ -294,8 +294,6 @@ def delete_memory(memory_id: int, agent_id: str = "default") -> bool:
         deleted = cursor.rowcount > 0
 
     if deleted:
-        from ..vector_index import get_index, has_sqlite_vec
-
         index = get_index()
         if has_sqlite_vec():
             try:
@@ -310,10 +308,13 @@ def delete_memory(memory_id: int, agent_id: str = "default") -> bool:
     return deleted
 
 
-def export_memories(agent_id: str = "default") -> list[dict]:
-    """Export all active memories for the agent as a list of dicts (without embeddings)."""
+def iter_export_memories(agent_id: str = "default", chunk_size: int = 1000) -> Iterator[list[dict]]:
+    """
+    Yield the agent's active memories (without embeddings) in chunks of at most chunk_size dicts.
+    Rows are pulled with fetchmany, so the whole corpus is never materialized at once.
+    """
     with get_connection() as conn:
-        rows = conn.execute(
+        cursor = conn.execute(
             """
             SELECT id, content, category, importance, decay_score,
                    access_count, last_accessed, created_at, updated_at
@@ -324,15 +325,25 @@ def export_memories(agent_id: str = "default") -> list[dict]:
             ORDER BY created_at DESC
             """,
             (agent_id,),
-        ).fetchall()
-    return [dict(r) for r in rows]
+        )
+        while rows := cursor.fetchmany(chunk_size):
+            yield [dict(r) for r in rows]
+
+
+def export_memories(agent_id: str = "default") -> list[dict]:
+    """Export all active memories for the agent as a list of dicts (without embeddings)."""
+    return [row for chunk in iter_export_memories(agent_id) for row in chunk]
 
 
 _VALID_CATEGORIES = {"general", "project", "trading", "finance", "person", "preference", "task", "decision"}
 
 
+_IMPORT_CHUNK = 500  # records per transaction
+
+
 def import_memories(records: list[dict], agent_id: str = "default") -> int:
     """Import memories from a list of dicts. Returns the number of records imported."""
+    reqs: list[MemorySaveRequest] = []
     imported = 0
     for rec in records:
         content = rec.get("content", "").strip()
@@ -349,8 +360,11 @@ def import_memories(records: list[dict], agent_id: str = "default") -> int:
             category=category,
             importance=importance,
         )
-        save_memory(req, agent_id=agent_id)
-        imported += 1
+        reqs.append(req)
+
+    # One transaction + one batched embedding call instead of a commit per record
+    for start in range(0, len(reqs), _IMPORT_CHUNK):
+        imported += len(save_memory_batch(reqs[start : start + _IMPORT_CHUNK], agent_id=agent_id))
 
     return imported
 
@@ -5,13 +5,76 @@ FTS5, semantic search, tag search, timeline.
 
 from __future__ import annotations
 
+import threading
+import time
+from collections import OrderedDict
 from datetime import UTC, datetime
+from operator import mul
 
+from .. import config, events
 from ..database import get_connection
-from ..decay import effective_score, should_forget
+from ..decay import effective_score
 from ..models import MemoryRecord
 from .memory import _embeddings_available
 
+# ── Semantic result cache (SIM-LRU) ─────────────────────────────────────────
+
+
+class _SemanticResultCache:
+    """
+    First-page search results keyed by query embedding, matched by cosine similarity.
+    Entries are partitioned by (agent_id, category, limit); each partition keeps its most
+    recently hit entries last. An entry is valid only while no memory event has been emitted
+    for its agent since it was stored (events.generation(agent_id)) and within SEMANTIC_CACHE_TTL.
+    """
+
+    _MAX_PARTITIONS = 256
+    _PER_PARTITION = 16
+
+    def __init__(self) -> None:
+        self._partitions: OrderedDict[tuple, list[tuple]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, qvec: list[float], threshold: float):
+        now = time.monotonic()
+        gen = events.generation(key[0])
+        with self._lock:
+            entries = self._partitions.get(key)
+            if not entries:
+                return None
+            # Drop entries invalidated by writes or expired
+            entries[:] = [e for e in entries if e[2] == gen and now - e[1] < config.SEMANTIC_CACHE_TTL]
+            best, best_sim = None, threshold
+            for entry in entries:
+                # Embeddings are L2-normalized: dot product == cosine similarity
+                sim = sum(map(mul, qvec, entry[0]))
+                if sim >= best_sim:
+                    best, best_sim = entry, sim
+            if best is None:
+                return None
+            entries.remove(best)
+            entries.append(best)
+            self._partitions.move_to_end(key)
+            return best[3]
+
+    def put(self, key: tuple, qvec: list[float], result: tuple, gen: int) -> None:
+        """Store a result computed at write generation `gen` (read before the query ran)."""
+        entry = (qvec, time.monotonic(), gen, result)
+        with self._lock:
+            entries = self._partitions.setdefault(key, [])
+            entries.append(entry)
+            del entries[: -self._PER_PARTITION]
+            self._partitions.move_to_end(key)
+            while len(self._partitions) > self._MAX_PARTITIONS:
+                self._partitions.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._partitions.clear()
+
+
+_result_cache = _SemanticResultCache()
+
 
 def search_memories(
     query: str,
@@ -33,28 +96,47 @@ def search_memories(
     falls back to FTS5 full-text search, then LIKE.
     Filters out fully-decayed memories. Reinforces access count on results.
     """
+    # Near-duplicate first-page queries are answered from the semantic cache (opt-in)
+    cache_key = qvec = None
+    cache_gen = 0
+    threshold = config.SEMANTIC_CACHE_THRESHOLD
+    if threshold > 0 and cursor is None and semantic and _embeddings_available():
+        from ..embedder import embed_query
+
+        cache_key = (agent_id, category, limit)
+        cache_gen = events.generation(agent_id)
+        qvec = embed_query(query)  # exact-query LRU: _semantic_search reuses this vector
+        hit = _result_cache.get(cache_key, qvec, threshold)
+        if hit is not None:
+            top, next_cursor, total_count = hit
+            if top:
+                _reinforce([r.id for r in top])
+            return list(top), next_cursor, total_count
+
     # Fetch extra results to ensure we have enough after filtering
     fetch_limit = limit * 3
 
-    if semantic and _embeddings_available():
-        results = _semantic_search(query, fetch_limit, category, agent_id, cursor)
+    use_semantic = semantic and _embeddings_available()
+    fts_total = None
+    # Forgotten memories (decay < 0.05) are filtered in SQL: they never take fetch slots
+    if use_semantic:
+        results = _semantic_search(query, fetch_limit, category, agent_id, cursor, active_only=True)
     else:
-        results = _fts_search(query, fetch_limit, category, agent_id, cursor)
+        results, fts_total = _fts_search(query, fetch_limit, category, agent_id, cursor, active_only=True)
 
-    # Filter forgotten memories, re-rank by combined score:
-    # similarity (semantic) × decay × importance_weight
-    alive = [r for r in results if not should_forget(r.decay_score or 1.0)]
-    alive.sort(
+    # Re-rank by combined score: similarity (semantic) × decay × importance_weight
+    ranked = sorted(
+        results,
         key=lambda r: (r.score if r.score and r.score > 0 else 1.0)
         * effective_score(r.decay_score or 1.0, r.importance),
         reverse=True,
     )
 
     # Get total count of matching active memories
-    total_count = _count_active_memories(query, category, agent_id)
+    total_count = fts_total if fts_total is not None else _count_active_memories(query, category, agent_id)
 
     # Take requested page + 1 to check if there are more results
-    page = alive[: limit + 1]
+    page = ranked[: limit + 1]
     has_more = len(page) > limit
     top = page[:limit]
 
@@ -64,6 +146,9 @@ def search_memories(
         last = top[-1]
         next_cursor = (last.decay_score or 1.0, last.id)
 
+    if cache_key is not None:
+        _result_cache.put(cache_key, qvec, (tuple(top), next_cursor, total_count), cache_gen)
+
     # Reinforce access for retrieved memories
     if top:
         _reinforce([r.id for r in top])
@@ -80,13 +165,14 @@ def get_timeline(
     """Return memories about a subject ordered by creation time with cursor pagination."""
     fetch_limit = limit * 2  # Fetch extra for sorting
 
+    fts_total = None
     if _embeddings_available():
         results = _semantic_search(subject, fetch_limit, category=None, agent_id=agent_id, cursor=cursor)
     else:
-        results = _fts_search(subject, fetch_limit, category=None, agent_id=agent_id, cursor=cursor)
+        results, fts_total = _fts_search(subject, fetch_limit, category=None, agent_id=agent_id, cursor=cursor)
 
     # Get total count
-    total_count = _count_active_memories(subject, None, agent_id)
+    total_count = fts_total if fts_total is not None else _count_active_memories(subject, None, agent_id)
 
     # Sort by creation time (oldest first)
     sorted_results = sorted(results, key=lambda r: r.created_at)
@@ -130,12 +216,14 @@ def search_by_tag(tag: str, agent_id: str = "default", limit: int = 20) -> list[
 
 def _count_active_memories(query: str, category: str | None, agent_id: str) -> int:
     """Count total active memories matching query (for pagination total)."""
+    # CROSS JOIN fissa l'ordine: prima il MATCH FTS5, poi lookup per PK su memories.
+    # Senza statistiche il planner partiva dall'indice per agente e sondava l'FTS riga per riga.
     with get_connection() as conn:
         safe_query = _sanitize_fts_query(query)
         if safe_query:
             sql = """
                 SELECT COUNT(*) FROM memories_fts
-                JOIN memories m ON memories_fts.rowid = m.id
+                CROSS JOIN memories m ON m.id = memories_fts.rowid
                 WHERE memories_fts MATCH :query
                   AND m.agent_id = :agent_id
                   AND m.compressed_into IS NULL
@@ -145,17 +233,21 @@ def _count_active_memories(query: str, category: str | None, agent_id: str) -> i
             """
             params: dict = {"query": safe_query, "agent_id": agent_id}
         else:
-            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            # Il sanitizer scarta solo query senza token utili (1 carattere, solo operatori):
+            # LIKE resta per quelle; q=* non filtra il testo e resta sull'indice per agente
             sql = """
                 SELECT COUNT(*) FROM memories
-                WHERE content LIKE :query ESCAPE '\\'
-                  AND agent_id = :agent_id
+                WHERE agent_id = :agent_id
                   AND compressed_into IS NULL
                   AND archived_at IS NULL
                   AND decay_score >= 0.05
                   AND (expires_at IS NULL OR expires_at > datetime('now'))
             """
-            params = {"query": f"%{escaped}%", "agent_id": agent_id}
+            params = {"agent_id": agent_id}
+            if query.strip() != "*":
+                escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                sql = sql.rstrip() + " AND content LIKE :query ESCAPE '\\'"
+                params["query"] = f"%{escaped}%"
 
         if category:
             # Prefix m. for FTS JOIN, no prefix for direct LIKE query
@@ -189,10 +281,20 @@ def _fts_search(
     category: str | None,
     agent_id: str = "default",
     cursor: tuple[float, int] | None = None,
-) -> list[MemoryRecord]:
-    """Full-text search via SQLite FTS5 with prefix wildcards, scoped to agent."""
+    *,
+    active_only: bool = False,
+) -> tuple[list[MemoryRecord], int | None]:
+    """
+    Full-text search via SQLite FTS5 with prefix wildcards, scoped to agent.
+    Returns (records, total). On the first page the total of active matches is computed
+    by a window over the same scan, so no second MATCH is needed; with a cursor the
+    scan only sees the rows after it and total is None.
+    active_only drops forgotten memories (decay_score < 0.05) in the query itself.
+    """
     with get_connection() as conn:
         safe_query = _sanitize_fts_query(query)
+        total_column = ""
+        content_filter = ""
 
         cursor_filter = ""
         if cursor:
@@ -202,20 +304,25 @@ def _fts_search(
                 if safe_query
                 else "AND ((decay_score, id) < (:cursor_score, :cursor_id))"
             )
+        else:
+            # Stesso criterio di _count_active_memories: attive con decay_score >= 0.05
+            col_prefix = "m." if safe_query else ""
+            total_column = f", SUM({col_prefix}decay_score >= 0.05) OVER () AS total"
 
         if safe_query:
             sql = """
                 SELECT m.id, m.content, m.category, m.importance,
                        m.decay_score, m.access_count, m.last_accessed,
-                       m.created_at, m.updated_at, rank AS score
+                       m.created_at, m.updated_at, rank AS score{total_column}
                 FROM memories_fts
-                JOIN memories m ON memories_fts.rowid = m.id
+                CROSS JOIN memories m ON m.id = memories_fts.rowid
                 WHERE memories_fts MATCH :query
                   AND m.agent_id = :agent_id
                   AND m.compressed_into IS NULL
                   AND m.archived_at IS NULL
                   AND (m.expires_at IS NULL OR m.expires_at > datetime('now'))
                   {category_filter}
+                  {decay_filter}
                   {cursor_filter}
                 ORDER BY m.decay_score DESC, m.id DESC
                 LIMIT :limit
@@ -225,24 +332,25 @@ def _fts_search(
             sql = """
                 SELECT id, content, category, importance,
                        decay_score, access_count, last_accessed,
-                       created_at, updated_at, NULL AS score
+                       created_at, updated_at, NULL AS score{total_column}
                 FROM memories
-                WHERE content LIKE :query ESCAPE '\\'
-                  AND agent_id = :agent_id
+                WHERE agent_id = :agent_id
+                  {content_filter}
                   AND compressed_into IS NULL
                   AND archived_at IS NULL
                   AND (expires_at IS NULL OR expires_at > datetime('now'))
                   {category_filter}
+                  {decay_filter}
                   {cursor_filter}
                 ORDER BY decay_score DESC, id DESC
                 LIMIT :limit
             """
-            # q=* → list all memories (global wildcard)
-            if query.strip() == "*":
-                escaped_query = ""
-            else:
+            params = {"limit": limit, "agent_id": agent_id}
+            # q=* → list all memories (global wildcard), no text predicate
+            if query.strip() != "*":
                 escaped_query = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
-            params = {"query": f"%{escaped_query}%", "limit": limit, "agent_id": agent_id}
+                content_filter = "AND content LIKE :query ESCAPE '\\'"
+                params["query"] = f"%{escaped_query}%"
 
         if cursor:
             params["cursor_score"] = cursor[0]
@@ -253,10 +361,23 @@ def _fts_search(
         )
         if category:
             params["category"] = category
+        decay_filter = ""
+        if active_only:
+            decay_filter = "AND m.decay_score >= 0.05" if safe_query else "AND decay_score >= 0.05"
+
+        sql = sql.format(
+            category_filter=category_filter,
+            decay_filter=decay_filter,
+            cursor_filter=cursor_filter,
+            total_column=total_column,
+            content_filter=content_filter,
+        )
+        rows = conn.execute(sql, params).fetchall()
 
-        rows = conn.execute(sql.format(category_filter=category_filter, cursor_filter=cursor_filter), params).fetchall()
-
-    return [_row_to_record(r) for r in rows]
+    total = None
+    if not cursor:
+        total = rows[0]["total"] if rows else 0
+    return [_row_to_record(r) for r in rows], total
 
 
 def _semantic_search(
@@ -265,8 +386,10 @@ def _semantic_search(
     category: str | None,
     agent_id: str = "default",
     cursor: tuple[float, int] | None = None,
+    *,
+    active_only: bool = False,
 ) -> list[MemoryRecord]:
-    """Semantic search with vector index, scoped to agent."""
+    """Semantic search with vector index, scoped to agent (active_only: skip forgotten memories)."""
     from ..embedder import embed_query
     from ..vector_index import get_index
 
@@ -291,6 +414,8 @@ def _semantic_search(
         if category:
             params.append(category)
 
+        decay_clause = "AND decay_score >= 0.05" if active_only else ""
+
         if cursor:
             decay_score, last_id = cursor
             cursor_filter = "AND ((decay_score, id) < (?, ?))"
@@ -305,6 +430,7 @@ def _semantic_search(
               AND archived_at IS NULL
               AND (expires_at IS NULL OR expires_at > datetime('now'))
               {category_clause}
+              {decay_clause}
               {cursor_filter}
             ORDER BY decay_score DESC, id DESC
         """
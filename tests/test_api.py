@@ -113,6 +113,75 @@ class TestDecay:
         assert r.json()["updated"] >= 0
 
 
+class TestBackgroundJobs:
+    def setup_method(self):
+        from kore_memory.main import _rate_buckets
+        _rate_buckets.clear()
+
+    def test_decay_run_background_returns_job(self):
+        """?background=true risponde 202 con job id; il risultato si legge da /jobs/{id}."""
+        r = client.post("/decay/run?background=true", headers=HEADERS)
+        assert r.status_code == 202
+        job = r.json()
+        assert job["kind"] == "decay"
+        assert job["status"] == "queued"
+
+        # TestClient esegue i background task prima di restituire la risposta
+        status = client.get(f"/jobs/{job['job_id']}", headers=HEADERS)
+        assert status.status_code == 200
+        data = status.json()
+        assert data["status"] == "done"
+        assert data["result"]["updated"] >= 0
+
+    def test_job_not_visible_to_other_agent(self):
+        r = client.post("/cleanup?background=true", headers=HEADERS)
+        job_id = r.json()["job_id"]
+        assert client.get(f"/jobs/{job_id}", headers=OTHER_AGENT).status_code == 404
+
+    def test_unknown_job(self):
+        assert client.get("/jobs/nonexistent", headers=HEADERS).status_code == 404
+
+    def test_repeated_job_is_coalesced(self):
+        """Un secondo job dello stesso tipo per lo stesso agente restituisce quello già in coda."""
+        import anyio
+        from fastapi import BackgroundTasks
+
+        from kore_memory import main
+
+        tasks = BackgroundTasks()
+        first = main._enqueue_job(tasks, "cleanup", main._cleanup_work, "coalesce-agent")
+        second = main._enqueue_job(tasks, "cleanup", main._cleanup_work, "coalesce-agent")
+        assert first.body == second.body
+        assert len(tasks.tasks) == 1
+
+        anyio.run(tasks)
+        assert not main._active_jobs
+        assert not main._agent_pass_locks
+        third = main._enqueue_job(BackgroundTasks(), "cleanup", main._cleanup_work, "coalesce-agent")
+        assert third.body != first.body
+        main._active_jobs.clear()
+
+    def test_sync_pass_waits_for_running_job(self):
+        """Il percorso sincrono prende lo stesso lock per agente dei job in background."""
+        import threading
+
+        from kore_memory import main
+
+        done = threading.Event()
+
+        def sync_cleanup():
+            client.post("/cleanup", headers=HEADERS)
+            done.set()
+
+        with main._agent_pass("test-agent"):
+            worker = threading.Thread(target=sync_cleanup)
+            worker.start()
+            assert not done.wait(0.2)
+        worker.join(timeout=5)
+        assert done.is_set()
+        assert not main._agent_pass_locks
+
+
 class TestCompress:
     def test_compress_run(self):
         r = client.post("/compress", headers=HEADERS)
@@ -176,6 +245,15 @@ class TestBatchSave:
         assert r.status_code == 201
         assert r.json()["total"] == 1
 
+    def test_batch_save_keeps_one_row_per_item(self):
+        """Item identici nel batch REST restano righe distinte (la dedup è solo nel tool MCP)."""
+        item = {"content": "Batch duplicate kept twice", "category": "general", "importance": 2}
+        r = client.post("/save/batch", json={"memories": [item, item]}, headers=HEADERS)
+        assert r.status_code == 201
+        ids = [s["id"] for s in r.json()["saved"]]
+        assert len(ids) == 2
+        assert ids[0] != ids[1]
+
     def test_batch_save_empty_rejected(self):
         """Batch vuoto — rifiutato da validazione."""
         r = client.post("/save/batch", json={"memories": []}, headers=HEADERS)
@@ -430,6 +508,24 @@ class TestExportImport:
         assert data["total"] >= 1
         assert len(data["memories"]) == data["total"]
 
+    def test_export_streams_chunks_as_one_document(self, monkeypatch):
+        """L'export in streaming concatena i chunk in un unico JSON valido con il totale corretto."""
+        from kore_memory import main
+
+        chunks = [[{"id": 1, "content": "a"}, {"id": 2, "content": "b"}], [{"id": 3, "content": "c"}]]
+        monkeypatch.setattr(main, "iter_export_memories", lambda agent_id: iter(chunks))
+        data = client.get("/export", headers=HEADERS).json()
+        assert [m["id"] for m in data["memories"]] == [1, 2, 3]
+        assert data["total"] == 3
+
+        monkeypatch.setattr(main, "iter_export_memories", lambda agent_id: iter([]))
+        assert client.get("/export", headers=HEADERS).json() == {"memories": [], "total": 0}
+
+    def test_export_schema_documented_in_openapi(self):
+        """La risposta in streaming resta documentata con lo schema MemoryExportResponse."""
+        ok = app.openapi()["paths"]["/export"]["get"]["responses"]["200"]
+        assert ok["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/MemoryExportResponse"}
+
     def test_export_scoped_to_agent(self):
         """L'export non include memorie di altri agenti."""
         agent_c = {"X-Agent-Id": "export-agent-c"}
@@ -626,6 +722,9 @@ class TestCursorPagination:
         """Un cursore non valido (stringa arbitraria non base64 decodificabile) deve rispondere 400."""
         r = client.get("/search?q=test&cursor=NON_VALIDO_!!!&semantic=false", headers=HEADERS)
         assert r.status_code == 400
+        # base64 valido ma di lunghezza errata
+        r = client.get("/search?q=test&cursor=AAAA&semantic=false", headers=HEADERS)
+        assert r.status_code == 400
 
     def test_has_more_flag(self):
         """Con 5 memorie e limit=2 has_more deve essere True; sull'ultima pagina False."""
@@ -649,6 +748,15 @@ class TestCursorPagination:
         assert last_has_more is False
 
 
+def test_cursor_codec_roundtrip():
+    """Il cursore codificato (struct + base64 urlsafe) deve ritornare la stessa tupla."""
+    from kore_memory.main import _decode_cursor, _encode_cursor
+
+    token = _encode_cursor((0.75, 42))
+    assert "=" not in token
+    assert _decode_cursor(token) == (0.75, 42)
+
+
 # ── Rate limiting ─────────────────────────────────────────────────────────────
 
 class TestRateLimit:
@@ -685,6 +793,124 @@ class TestRateLimit:
             "Il rate limit di /cleanup deve essere indipendente da /decay/run"
         )
 
+    def test_rate_limit_shared_bucket(self):
+        """/auto-tune condivide il bucket di /decay/run; il 429 porta gli header di sicurezza."""
+        for _ in range(5):
+            client.post("/decay/run", headers=HEADERS)
+
+        r = client.post("/auto-tune", headers=HEADERS)
+        assert r.status_code == 429
+        assert r.json() == {"detail": "Rate limit exceeded. Retry later."}
+        assert r.headers["x-content-type-options"] == "nosniff"
+
+    def test_rejected_requests_do_not_consume_quota(self, monkeypatch):
+        """401 e 422 non consumano la quota: il limite si applica dopo auth e validazione."""
+        monkeypatch.setenv("KORE_LOCAL_ONLY", "0")
+        for _ in range(6):
+            assert client.post("/decay/run", headers=HEADERS).status_code == 401
+        monkeypatch.setenv("KORE_LOCAL_ONLY", "1")
+        for _ in range(6):
+            assert client.post("/decay/run?background=maybe", headers=HEADERS).status_code == 422
+
+        for _ in range(5):
+            assert client.post("/decay/run", headers=HEADERS).status_code == 200
+        assert client.post("/decay/run", headers=HEADERS).status_code == 429
+
+    def test_background_sweep_evicts_stale_buckets(self, monkeypatch):
+        """Il task di GC avviato nel lifespan rimuove i bucket scaduti fuori dal percorso della richiesta."""
+        import anyio
+
+        from kore_memory import main
+
+        stale = main._RingBucket(3)
+        stale.hit(main.time.monotonic_ns() - main._RATE_MAX_WINDOW_NS - 1, 1)
+        main._rate_buckets.buckets[5]["stale:/search"] = stale
+        monkeypatch.setattr(main, "_RATE_SWEEP_INTERVAL", 0)
+
+        async def run_briefly():
+            with anyio.move_on_after(0.05):
+                await main._rate_sweep_loop()
+
+        anyio.run(run_briefly)
+        assert "stale:/search" not in main._rate_buckets.buckets[5]
+
+    def test_lifespan_starts_and_stops_sweep(self):
+        """Avvio e shutdown dell'app con il task di GC attivo."""
+        with TestClient(app) as c:
+            assert c.get("/health").status_code == 200
+
+    def test_round_robin_sweep_cleans_idle_shards(self):
+        """sweep_next() visita gli shard a turno e rimuove i bucket scaduti anche senza nuovo traffico."""
+        from kore_memory import main
+
+        rb = main._rate_buckets
+        now = main.time.monotonic_ns()
+        stale, live = main._RingBucket(3), main._RingBucket(3)
+        stale.hit(now - main._RATE_MAX_WINDOW_NS - 1, 1)
+        live.hit(now, 1)
+        rb.buckets[0]["stale:/search"] = stale
+        rb.buckets[0]["live:/search"] = live
+        rb.buckets[1]["empty:/search"] = main._RingBucket(3)
+
+        rb._sweep_cursor = 0
+        assert rb.sweep_next(now) == 1
+        assert rb.sweep_next(now) == 1
+        assert list(rb.buckets[0]) == ["live:/search"]
+        assert not rb.buckets[1]
+
+    def test_full_shard_keeps_live_buckets_and_fails_closed(self, monkeypatch):
+        """Con lo shard pieno si rimuovono solo i bucket scaduti: i client attivi non perdono la quota."""
+        from kore_memory import main
+
+        # Un solo shard da 2 bucket: ogni chiave finisce nello stesso shard
+        monkeypatch.setattr(main, "_RATE_SHARDS", 1)
+        monkeypatch.setattr(main, "_RATE_SHARD_CAP", 2)
+        shard = main._rate_buckets.buckets[0]
+
+        assert main._check_rate_limit("10.0.0.1", "/search")
+        assert main._check_rate_limit("10.0.0.2", "/search")
+        # Un IP nuovo (es. X-Forwarded-For ruotato) non può sfrattare un client attivo
+        assert not main._check_rate_limit("10.0.0.3", "/search")
+        assert list(shard) == ["10.0.0.1:/search", "10.0.0.2:/search"]
+        assert shard["10.0.0.1:/search"].last != 0
+
+        # Quando la finestra di un bucket è scaduta, il suo posto viene liberato
+        stale = shard["10.0.0.1:/search"]
+        stale.ts[stale.head - 1] = main.time.monotonic_ns() - main._RATE_MAX_WINDOW_NS - 1
+        assert main._check_rate_limit("10.0.0.3", "/search")
+        assert list(shard) == ["10.0.0.2:/search", "10.0.0.3:/search"]
+
+    def test_client_ip_from_proxy_headers(self, monkeypatch):
+        """Fuori da local-only si usa il primo IP di X-Forwarded-For, poi X-Real-IP, poi il socket."""
+        from kore_memory import main
+
+        monkeypatch.setattr(main.config, "LOCAL_ONLY", False)
+
+        def scope(*headers):
+            return {"client": ("10.0.0.9", 1234), "headers": list(headers)}
+
+        xff = (b"x-forwarded-for", b" 203.0.113.7 , 10.0.0.1, 10.0.0.2")
+        real = (b"x-real-ip", b" 198.51.100.4 ")
+        assert main._get_client_ip(scope(real, xff)) == "203.0.113.7"
+        assert main._get_client_ip(scope((b"x-forwarded-for", b"203.0.113.8"))) == "203.0.113.8"
+        assert main._get_client_ip(scope(real)) == "198.51.100.4"
+        assert main._get_client_ip(scope()) == "10.0.0.9"
+
+        monkeypatch.setattr(main.config, "LOCAL_ONLY", True)
+        assert main._get_client_ip(scope(xff)) == "10.0.0.9"
+
+    def test_ring_bucket_sliding_window(self):
+        """Il ring buffer ammette max_requests hit per finestra e libera lo slot più vecchio alla scadenza."""
+        from kore_memory import main
+
+        ring = main._RingBucket(2)
+        assert ring.last == 0
+        assert ring.hit(100, 50) and ring.hit(120, 50)
+        assert not ring.hit(140, 50)  # 2 hit negli ultimi 50 ns
+        assert ring.hit(150, 50)  # lo slot di t=100 è scaduto
+        assert ring.last == 150
+        assert not ring.hit(160, 50)
+
 
 # ── Update memory — correttezza del campo importance ─────────────────────────
 
@@ -758,3 +984,128 @@ class TestAutoScore:
             f"importance atteso=1 (esplicito), ottenuto={data['importance']}. "
             "Un importance esplicito non deve essere sovrascritto dall'auto-scorer."
         )
+
+
+# ── Metrics ───────────────────────────────────────────────────────────────────
+
+class TestMetrics:
+    def test_metrics_prometheus_format(self):
+        """/metrics deve esporre i 4 gauge in formato testo Prometheus."""
+        r = client.get("/metrics", headers=HEADERS)
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("text/plain")
+        values = dict(line.split(" ", 1) for line in r.text.splitlines() if line and not line.startswith("#"))
+        assert set(values) == {
+            "kore_memories_total",
+            "kore_memories_active",
+            "kore_memories_archived",
+            "kore_db_size_bytes",
+        }
+        assert all(v.isdigit() for v in values.values())
+
+    def test_metrics_scrapes_share_cached_stats(self, monkeypatch):
+        """Scrape ravvicinati riusano lo stesso get_stats entro il TTL."""
+        from kore_memory import main
+
+        calls = []
+
+        def fake_stats(agent_id):
+            calls.append(agent_id)
+            return {"total_memories": 3, "active_memories": 2, "archived_memories": 1, "db_size_bytes": 10}
+
+        monkeypatch.setattr(main, "get_stats", fake_stats)
+        monkeypatch.setattr(main, "_agg_cache", {})
+        client.get("/metrics", headers=HEADERS)
+        r = client.get("/metrics", headers=HEADERS)
+        assert "kore_memories_total 3" in r.text
+        assert calls == ["test-agent"]
+
+    def test_probe_endpoints_skip_security_headers(self):
+        """/metrics e /health non passano dal middleware degli header di sicurezza."""
+        for path in ("/metrics", "/health"):
+            r = client.get(path, headers=HEADERS)
+            assert "content-security-policy" not in r.headers
+        assert "content-security-policy" in client.get("/stats/scoring", headers=HEADERS).headers
+
+
+# ── Global exception handler ──────────────────────────────────────────────────
+
+class TestUnhandledError:
+    def test_500_body_and_log(self, caplog):
+        """Errore non gestito: 500 generico al client, traceback solo nel log kore.api."""
+        def boom():
+            raise RuntimeError("boom")
+
+        app.add_api_route("/__test_boom", boom)
+        try:
+            c = TestClient(app, raise_server_exceptions=False)
+            with caplog.at_level("ERROR", logger="kore.api"):
+                r = c.get("/__test_boom")
+        finally:
+            app.router.routes[:] = [rt for rt in app.router.routes if getattr(rt, "path", None) != "/__test_boom"]
+
+        assert r.status_code == 500
+        assert r.json() == {"error": "Internal server error"}
+        assert any(rec.name == "kore.api" and rec.exc_info for rec in caplog.records)
+
+
+class TestHealthCache:
+    def test_health_reuses_recent_result(self, monkeypatch):
+        """Entro il TTL /health non interroga di nuovo il database."""
+        from kore_memory import main
+
+        calls = []
+        monkeypatch.setattr(main, "_health_cache", None)
+        monkeypatch.setattr(main, "_db_ping", lambda: calls.append(1))
+
+        assert client.get("/health").json()["status"] == "ok"
+        assert client.get("/health").json()["status"] == "ok"
+        assert len(calls) == 1
+
+        # Scaduto il TTL si ricontrolla
+        monkeypatch.setattr(main, "_health_cache", (float("-inf"), {}))
+        client.get("/health")
+        assert len(calls) == 2
+
+
+class TestClientDisconnect:
+    def test_disconnected_client_skips_query(self, monkeypatch):
+        """Se il client si è già disconnesso, /search e /timeline non interrogano il DB."""
+        import anyio
+
+        from kore_memory import main
+
+        calls = []
+        monkeypatch.setattr(main, "search_memories", lambda **kw: calls.append(kw))
+        monkeypatch.setattr(main, "get_timeline", lambda **kw: calls.append(kw))
+
+        async def request(path: str, query: bytes) -> list[dict]:
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": path,
+                "raw_path": path.encode(),
+                "root_path": "",
+                "query_string": query,
+                "headers": [(b"host", b"testserver"), (b"x-agent-id", b"test-agent")],
+                "client": ("testclient", 50000),
+                "server": ("testserver", 80),
+            }
+            sent = []
+
+            async def receive():
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                sent.append(message)
+
+            await app(scope, receive, send)
+            return sent
+
+        for path, query in (("/search", b"q=gone"), ("/timeline", b"subject=gone")):
+            sent = anyio.run(request, path, query)
+            assert sent[0]["status"] == 499
+        assert calls == []
@@ -271,6 +271,17 @@ class TestAutoTuneAPI:
         for level in ["1", "2", "3", "4", "5"]:
             assert level in dist
 
+    def test_stats_scoring_values_from_single_pass(self):
+        """Distribution, total and averages agree with the saved memories."""
+        h = {"X-Agent-Id": "scoring-values-agent"}
+        client.post("/save", json={"content": "Scoring value memory two", "importance": 2}, headers=h)
+        client.post("/save", json={"content": "Scoring value memory four", "importance": 4}, headers=h)
+        data = client.get("/stats/scoring", headers=h).json()
+        assert data["total"] == 2
+        assert data["distribution"] == {"1": 0, "2": 1, "3": 0, "4": 1, "5": 0}
+        assert data["avg_importance"] == 3.0
+        assert data["never_accessed_30d"] == 0
+
     def test_stats_scoring_empty_agent(self):
         """Stats for an agent with no memories should return zeroes."""
         r = client.get("/stats/scoring", headers={"X-Agent-Id": "empty-agent-xyz"})
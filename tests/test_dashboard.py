@@ -74,7 +74,7 @@ async def test_dashboard_has_relaxed_csp(client):
 @pytest.mark.anyio
 async def test_api_keeps_strict_csp(client):
     """Le API devono mantenere il CSP restrittivo (default-src 'none')."""
-    resp = await client.get("/health")
+    resp = await client.get("/plugins")
     csp = resp.headers.get("content-security-policy", "")
     assert "default-src 'none'" in csp
 
@@ -98,3 +98,22 @@ async def test_dashboard_contains_js_api_helpers(client):
     assert "function loadMemories(" in html
     assert "function loadOverview(" in html
     assert "function loadGraph(" in html
+
+
+@pytest.mark.anyio
+async def test_favicon_served_as_svg(client):
+    """GET /favicon.svg deve ritornare l'SVG (letto una sola volta e tenuto in memoria)."""
+    resp = await client.get("/favicon.svg")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("image/svg+xml")
+    assert resp.content == app.state.favicon
+
+
+@pytest.mark.anyio
+async def test_dashboard_script_nonce_matches_csp(client):
+    """Il nonce iniettato nei tag <script> deve coincidere con quello dell'header CSP."""
+    resp = await client.get("/dashboard")
+    csp = resp.headers["content-security-policy"]
+    nonce = csp.split("'nonce-", 1)[1].split("'", 1)[0]
+    assert f'<script nonce="{nonce}">' in resp.text
+    assert "<script>" not in resp.text
@@ -304,6 +304,28 @@ class TestMemorySaveBatch:
         result = memory_save_batch(memories=memories, agent_id=AGENT)
         assert result["total"] == 1
 
+    def test_save_batch_dedups_identical_items(self):
+        memories = [
+            {"content": "Duplicated batch content item"},
+            {"content": "Unique batch content item"},
+            {"content": "Duplicated batch content item"},
+        ]
+        result = memory_save_batch(memories=memories, agent_id=AGENT)
+        ids = [s["id"] for s in result["saved"]]
+        assert len(ids) == 3
+        assert ids[0] == ids[2] != ids[1]
+
+    def test_save_batch_counts_validation_errors(self):
+        memories = [
+            {"content": "Valid batch content one"},
+            {"content": "Invalid category content", "category": "not-a-category"},
+            {"content": "Valid batch content two", "importance": 4},
+        ]
+        result = memory_save_batch(memories=memories, agent_id=AGENT)
+        assert result["total"] == 2
+        assert result["errors"] == 1
+        assert result["saved"][1]["importance"] == 4
+
 
 class TestMemoryAddRelation:
     def test_add_relation_between_memories(self):
@@ -345,3 +367,15 @@ class TestMemoryTimeline:
         assert "total" in result
         assert "has_more" in result
         assert isinstance(result["results"], list)
+
+
+class TestSanitizeAgentId:
+    def test_fast_path_and_translate_path_agree(self):
+        from kore_memory.mcp_server import _sanitize_agent_id
+
+        assert _sanitize_agent_id("default") == "default"
+        assert _sanitize_agent_id("agent-1_x") == "agent-1_x"
+        assert _sanitize_agent_id("bad/../agent") == "badagent"
+        assert _sanitize_agent_id("àgent") == "gent"
+        assert _sanitize_agent_id("!!!") == "default"
+        assert _sanitize_agent_id("a" * 80) == "a" * 64
@@ -100,6 +100,25 @@ class TestSessionMemories:
         sessions = r.json()
         assert any(s["id"] == "auto-sess" for s in sessions)
 
+    def test_invalid_session_header_rejected(self, client):
+        """X-Session-Id with characters outside [A-Za-z0-9_.-] is rejected with 400."""
+        h = {**HEADERS, "X-Session-Id": "bad/session"}
+        r = client.post("/save", json={"content": "Invalid session header", "category": "general"}, headers=h)
+        assert r.status_code == 400
+
+    def test_oversized_session_header_rejected(self, client):
+        """X-Session-Id longer than 128 characters is rejected with 400."""
+        h = {**HEADERS, "X-Session-Id": "a" * 129}
+        r = client.post("/save", json={"content": "Oversized session header", "category": "general"}, headers=h)
+        assert r.status_code == 400
+
+    def test_blank_session_header_ignored(self, client):
+        """A whitespace-only X-Session-Id is treated as absent."""
+        h = {**HEADERS, "X-Session-Id": "   "}
+        r = client.post("/save", json={"content": "Blank session header", "category": "general"}, headers=h)
+        assert r.status_code == 201
+        assert client.get("/sessions", headers=HEADERS).json() == []
+
     def test_session_memories_empty(self, client):
         client.post("/sessions", json={"session_id": "empty-sess"}, headers=HEADERS)
         r = client.get("/sessions/empty-sess/memories", headers=HEADERS)
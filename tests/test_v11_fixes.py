@@ -238,6 +238,129 @@ class TestCompositeIndex:
             ).fetchall()
             assert len(indexes) == 1, "Indice composito idx_agent_decay_active mancante"
 
+    def test_session_and_category_queries_use_an_index(self):
+        """Le query per sessione e per categoria devono fare SEARCH su un indice, non SCAN."""
+        with get_connection() as conn:
+            session_plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM memories WHERE session_id = ? AND agent_id = ? ORDER BY created_at",
+                ("s", "a"),
+            ).fetchall()
+            category_plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM memories WHERE agent_id = ? AND category = ?"
+                " ORDER BY created_at DESC",
+                ("a", "c"),
+            ).fetchall()
+        assert "idx_memories_session" in session_plan[0][3]
+        assert "idx_memories_agent_cat_created" in category_plan[0][3]
+        assert all("TEMP B-TREE" not in row[3] for row in session_plan + category_plan)
+
+    def test_tag_search_reads_live_index_in_order(self):
+        """search_by_tag scorre l'indice parziale delle memorie vive già ordinato, senza TEMP B-TREE."""
+        with get_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT m.id FROM memories m JOIN memory_tags t ON m.id = t.memory_id"
+                " WHERE t.tag = ? AND m.agent_id = ? AND m.compressed_into IS NULL AND m.archived_at IS NULL"
+                " ORDER BY m.importance DESC, m.created_at DESC LIMIT 20",
+                ("t", "a"),
+            ).fetchall()
+        assert "idx_memories_agent_live_imp" in plan[0][3]
+        assert all("TEMP B-TREE" not in row[3] for row in plan)
+
+    def test_fts_count_runs_match_first(self):
+        """Il COUNT FTS deve scandire memories_fts e poi cercare memories per PK."""
+        with get_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM memories_fts"
+                " CROSS JOIN memories m ON m.id = memories_fts.rowid"
+                " WHERE memories_fts MATCH ? AND m.agent_id = ? AND m.compressed_into IS NULL"
+                " AND m.archived_at IS NULL AND m.decay_score >= 0.05",
+                ("kore", "a"),
+            ).fetchall()
+        assert "memories_fts" in plan[0][3]
+        assert "PRIMARY KEY" in plan[1][3]
+
+    def test_planner_refresh_runs_off_thread_and_coalesces(self, monkeypatch):
+        """PRAGMA optimize gira in un thread separato; i trigger durante un run non ne avviano altri."""
+        from kore_memory import database
+
+        started, release = threading.Event(), threading.Event()
+        runs = []
+
+        def slow_optimize():
+            runs.append(threading.current_thread().name)
+            started.set()
+            release.wait(5)
+            with database._optimize_lock:
+                database._optimize_running = False
+
+        monkeypatch.setattr(database, "_OPTIMIZE_EVERY", 10)
+        monkeypatch.setattr(database, "_inserted_since_optimize", 0)
+        monkeypatch.setattr(database, "_optimize", slow_optimize)
+
+        database.note_inserts(10)
+        assert started.wait(5)
+        database.note_inserts(50)  # coalesced: un refresh è già in corso
+        release.set()
+        assert runs == ["kore-optimize"]
+
+    def test_single_saves_count_towards_planner_refresh(self, monkeypatch):
+        """Anche save_memory conta gli insert: il refresh scatta senza passare dal batch."""
+        from kore_memory import database
+
+        done = threading.Event()
+
+        def fake_optimize():
+            with database._optimize_lock:
+                database._optimize_running = False
+            done.set()
+
+        monkeypatch.setattr(database, "_OPTIMIZE_EVERY", 3)
+        monkeypatch.setattr(database, "_inserted_since_optimize", 0)
+        monkeypatch.setattr(database, "_optimize", fake_optimize)
+
+        _save("Insert singolo per il planner uno")
+        _save("Insert singolo per il planner due")
+        assert not done.is_set()
+        _save("Insert singolo per il planner tre")
+        assert done.wait(5)
+        _cleanup_agent()
+
+
+# ── PERF: trigger FTS ────────────────────────────────────────────────────────
+
+
+class TestFtsUpdateTrigger:
+    def setup_method(self):
+        _cleanup_agent()
+
+    def test_old_trigger_is_migrated_to_indexed_columns(self):
+        """init_db migra il vecchio trigger (qualsiasi UPDATE) a UPDATE OF content, category."""
+        from kore_memory.database import init_db
+
+        with get_connection() as conn:
+            conn.execute("DROP TRIGGER memories_au")
+            conn.execute(
+                "CREATE TRIGGER memories_au AFTER UPDATE ON memories BEGIN"
+                " INSERT INTO memories_fts (memories_fts, rowid, content, category)"
+                " VALUES ('delete', old.id, old.content, old.category);"
+                " INSERT INTO memories_fts (rowid, content, category) VALUES (new.id, new.content, new.category);"
+                " END"
+            )
+        init_db()
+        with get_connection() as conn:
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'memories_au'").fetchone()[0]
+        assert "UPDATE OF content, category" in sql
+
+    def test_content_update_still_reindexes(self):
+        """Modificare il contenuto aggiorna ancora l'indice full-text."""
+        mid = _save("Testo originale del trigger", importance=2)
+        r = client.put(f"/memories/{mid}", json={"content": "Testo riscritto del trigger"}, headers=HEADERS)
+        assert r.status_code == 200
+        r = client.get("/search", params={"q": "riscritto", "semantic": "false"}, headers=HEADERS)
+        assert [m["id"] for m in r.json()["results"]] == [mid]
+        r = client.get("/search", params={"q": "originale", "semantic": "false"}, headers=HEADERS)
+        assert r.json()["results"] == []
+
 
 # ── VectorIndex thread-safety ────────────────────────────────────────────────
 
@@ -6,6 +6,7 @@ integrazioni PydanticAI/OpenAI/LangChain, MCP HTTP transport.
 
 from unittest.mock import MagicMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
 
 from kore_memory.client import AsyncKoreClient, KoreClient
@@ -246,3 +247,269 @@ class TestOptionalDependencies:
             data = tomllib.load(f)
         optional = data["project"]["optional-dependencies"]
         assert "openai-agents" in optional
+
+
+class TestQueryEmbeddingCache:
+    def test_repeated_query_hits_cache(self, monkeypatch):
+        """La stessa query (anche con spazi attorno) viene codificata una sola volta."""
+        from kore_memory import embedder
+
+        calls = []
+
+        class _Vec(list):
+            def tolist(self):
+                return list(self)
+
+        class _FakeModel:
+            prompts = None
+
+            def encode(self, text, normalize_embeddings=True):
+                calls.append(text)
+                return _Vec([0.5, 0.5])
+
+        monkeypatch.setattr(embedder, "get_model", lambda: _FakeModel())
+        embedder._embed_query_cached.cache_clear()
+        try:
+            assert embedder.embed_query("kore cache") == [0.5, 0.5]
+            assert embedder.embed_query("  kore cache ") == [0.5, 0.5]
+            assert calls == ["kore cache"]
+            assert embedder.query_cache_stats()["hits"] == 1
+        finally:
+            embedder._embed_query_cached.cache_clear()
+
+
+class TestSemanticResultCache:
+    def test_near_duplicate_query_reuses_results_until_write(self, monkeypatch):
+        """Query quasi identiche riusano la prima pagina; un evento di scrittura invalida la cache."""
+        from kore_memory import config, embedder, events
+        from kore_memory.models import MemoryRecord
+        from kore_memory.repository import search
+
+        vectors = {"who is alice": [1.0, 0.0], "tell me about alice": [0.99, 0.141], "weather": [0.0, 1.0]}
+        calls = []
+
+        def fake_semantic(query, limit, category, agent_id="default", cursor=None, active_only=False):
+            calls.append(query)
+            return [
+                MemoryRecord(
+                    id=1,
+                    content="Alice works on Kore",
+                    category="people",
+                    importance=3,
+                    created_at="2026-01-15T10:30:00",
+                    updated_at="2026-01-15T10:30:00",
+                    score=0.9,
+                )
+            ]
+
+        monkeypatch.setattr(config, "SEMANTIC_CACHE_THRESHOLD", 0.97)
+        monkeypatch.setattr(search, "_embeddings_available", lambda: True)
+        monkeypatch.setattr(embedder, "embed_query", lambda q: vectors[q])
+        monkeypatch.setattr(search, "_semantic_search", fake_semantic)
+        monkeypatch.setattr(search, "_reinforce", lambda ids: None)
+        search._result_cache.clear()
+
+        search.search_memories("who is alice", agent_id="cache-agent")
+        results, _, _ = search.search_memories("tell me about alice", agent_id="cache-agent")
+        assert [r.id for r in results] == [1]
+        assert calls == ["who is alice"]
+
+        search.search_memories("weather", agent_id="cache-agent")
+        assert calls == ["who is alice", "weather"]
+
+        events.emit(events.MEMORY_SAVED, {"id": 2, "agent_id": "cache-agent"})
+        search.search_memories("tell me about alice", agent_id="cache-agent")
+        assert calls[-1] == "tell me about alice"
+        search._result_cache.clear()
+
+
+class TestInt8Embeddings:
+    def test_int8_roundtrip_keeps_cosine_and_reads_float32(self, monkeypatch):
+        """Con KORE_EMBED_INT8 il blob è ~4x più piccolo e il coseno resta quasi invariato."""
+        from kore_memory import config, embedder
+
+        vec = [0.6, -0.48, 0.0, 0.64]
+        plain = embedder.serialize(vec)
+        monkeypatch.setattr(config, "EMBED_INT8", True)
+        packed = embedder.serialize(vec)
+
+        assert packed.startswith("q8:")
+        restored = embedder.deserialize(packed)
+        assert len(restored) == len(vec)
+        assert embedder.cosine_similarity(vec, restored) > 0.999
+        # i blob float32 già salvati restano leggibili
+        assert embedder.deserialize(plain) == pytest.approx(vec, abs=1e-6)
+        assert embedder.serialize([0.0, 0.0]).startswith("q8:")
+
+
+class TestBatchSerialization:
+    def test_serialize_batch_matches_per_vector_format(self, monkeypatch):
+        """serialize_batch produce gli stessi blob di serialize(), con e senza numpy."""
+        from kore_memory import embedder
+
+        vectors = [[0.6, -0.48, 0.0, 0.64], [1.0, 0.0, 0.0, 0.0], [-0.25, 0.5, 0.75, 0.0]]
+        expected = [embedder.serialize(v) for v in vectors]
+        assert embedder.serialize_batch(vectors) == expected
+        assert embedder.serialize_batch([]) == []
+
+        monkeypatch.setattr(embedder, "_HAS_NUMPY", False)
+        assert embedder.serialize_batch(vectors) == expected
+
+
+class TestDecayPass:
+    def test_decay_pass_writes_in_chunks(self, monkeypatch):
+        """Il decay pass aggiorna tutte le righe anche quando le spezza in più transazioni."""
+        from kore_memory.repository import lifecycle
+
+        _cleanup()
+        ids = [_save(f"Memoria decay a chunk {i}", importance=2) for i in range(5)]
+        other, _ = save_memory(
+            MemorySaveRequest(content="Memoria di un altro agente", importance=2), agent_id="v12-other"
+        )
+        with get_connection() as conn:
+            conn.execute("UPDATE memories SET decay_score = 0.5 WHERE agent_id IN ('test-v12', 'v12-other')")
+
+        monkeypatch.setattr(lifecycle, "_DECAY_CHUNK", 2)
+        assert lifecycle.run_decay_pass(agent_id="test-v12") == 5
+        with get_connection() as conn:
+            scores = [r[0] for r in conn.execute("SELECT decay_score FROM memories WHERE id IN (?,?,?,?,?)", ids)]
+            other_score = conn.execute("SELECT decay_score FROM memories WHERE id = ?", (other,)).fetchone()[0]
+            conn.execute("DELETE FROM memories WHERE agent_id = 'v12-other'")
+        assert scores == [1.0] * 5
+        assert other_score == 0.5
+        _cleanup()
+
+
+class TestSearchTotalWithoutCount:
+    def test_first_page_total_comes_from_the_search_scan(self, monkeypatch):
+        """Prima pagina: il totale arriva dalla window sulla stessa scansione FTS, senza COUNT(*)."""
+        from kore_memory.repository import search
+
+        _cleanup()
+        for i in range(5):
+            _save(f"Totale senza count numero {i}", importance=3)
+
+        counted = []
+        original = search._count_active_memories
+        monkeypatch.setattr(search, "_embeddings_available", lambda: False)
+        monkeypatch.setattr(search, "_count_active_memories", lambda *a: counted.append(a) or original(*a))
+
+        _, _, total = search.search_memories("Totale senza count", limit=5, agent_id="test-v12")
+        assert total == 5
+        # pagina troncata (LIMIT 3 su 5 match): il totale resta esatto
+        _, cursor, total = search.search_memories("Totale senza count", limit=1, agent_id="test-v12")
+        assert total == 5 and cursor is not None
+        assert counted == []
+
+        _, _, total = search.search_memories("Totale senza count", limit=1, agent_id="test-v12", cursor=cursor)
+        assert total == 5
+        assert len(counted) == 1
+        _cleanup()
+
+    def test_forgotten_memories_filtered_in_query(self, monkeypatch):
+        """Le memorie dimenticate (decay < 0.05, anche 0.0) non arrivano in pagina e non sono contate."""
+        from kore_memory.repository import search
+
+        _cleanup()
+        alive = _save("Ricordo filtro oblio vivo", importance=3)
+        faded = [_save(f"Ricordo filtro oblio sbiadito {i}", importance=3) for i in range(2)]
+        with get_connection() as conn:
+            conn.execute("UPDATE memories SET decay_score = 0.01 WHERE id = ?", (faded[0],))
+            conn.execute("UPDATE memories SET decay_score = 0.0 WHERE id = ?", (faded[1],))
+        monkeypatch.setattr(search, "_embeddings_available", lambda: False)
+
+        results, _, total = search.search_memories("filtro oblio", limit=5, agent_id="test-v12")
+        assert [r.id for r in results] == [alive]
+        assert total == 1
+        _cleanup()
+
+    def test_wildcard_total_on_cursor_pages(self, monkeypatch):
+        """q=* conta tutte le memorie attive anche sulle pagine successive (COUNT senza LIKE)."""
+        from kore_memory.repository import search
+
+        _cleanup()
+        for i in range(4):
+            _save(f"Memoria elencata con wildcard {i}", importance=3)
+        monkeypatch.setattr(search, "_embeddings_available", lambda: False)
+
+        first, cursor, total = search.search_memories("*", limit=2, agent_id="test-v12")
+        assert total == 4 and len(first) == 2
+        second, _, total = search.search_memories("*", limit=2, agent_id="test-v12", cursor=cursor)
+        assert total == 4
+        assert {r.id for r in first}.isdisjoint(r.id for r in second)
+        _cleanup()
+
+
+class TestAgentWriteGeneration:
+    def test_generation_is_scoped_per_agent(self):
+        """Le scritture di un agente non invalidano le cache di un altro; gli eventi "all" sì."""
+        from kore_memory import events
+
+        a, b = events.generation("gen-a"), events.generation("gen-b")
+        events.emit(events.MEMORY_SAVED, {"id": 1, "agent_id": "gen-a"})
+        assert events.generation("gen-a") == a + 1
+        assert events.generation("gen-b") == b
+
+        events.emit(events.MEMORY_DECAYED, {"agent_id": "all", "updated": 0})
+        assert events.generation("gen-b") == b + 1
+
+    def test_cleanup_of_expired_rows_bumps_generation(self):
+        from kore_memory import events
+        from kore_memory.repository import cleanup_expired
+
+        _cleanup()
+        mid = _save("Memoria che scade subito", importance=2)
+        with get_connection() as conn:
+            conn.execute("UPDATE memories SET expires_at = datetime('now', '-1 hour') WHERE id = ?", (mid,))
+        before = events.generation("test-v12")
+        assert cleanup_expired("test-v12") == 1
+        assert events.generation("test-v12") > before
+
+
+class TestVectorIndexInvalidation:
+    def test_only_membership_changes_reload_the_index(self):
+        """Decay e importance non toccano l'insieme dei vettori; archive/restore/cleanup sì."""
+        from kore_memory.repository import archive_memory, cleanup_expired, restore_memory, run_decay_pass
+        from kore_memory.vector_index import VectorIndex
+
+        _cleanup()
+        mid = _save("Memoria indicizzata per il test di invalidazione", importance=2)
+        index = VectorIndex()
+        cache = index.get_cache("test-v12")
+        with patch("kore_memory.repository.lifecycle.get_index", return_value=index):
+            cache.dirty = False
+            run_decay_pass(agent_id="test-v12")
+            assert not cache.dirty
+
+            assert archive_memory(mid, agent_id="test-v12")
+            assert cache.dirty
+            cache.dirty = False
+            assert restore_memory(mid, agent_id="test-v12")
+            assert cache.dirty
+
+            cache.dirty = False
+            with get_connection() as conn:
+                conn.execute("UPDATE memories SET expires_at = datetime('now', '-1 hour') WHERE id = ?", (mid,))
+            assert cleanup_expired("test-v12") == 1
+            assert cache.dirty
+        _cleanup()
+
+
+class TestReadOnlyRecords:
+    def test_memory_record_is_frozen(self):
+        """I record restituiti dalla cache semantica sono condivisi: non devono essere mutabili."""
+        import pydantic
+
+        from kore_memory.models import MemoryRecord
+
+        record = MemoryRecord(
+            id=1,
+            content="Record condiviso",
+            category="general",
+            importance=2,
+            created_at="2026-01-15T10:30:00",
+            updated_at="2026-01-15T10:30:00",
+        )
+        with pytest.raises(pydantic.ValidationError):
+            record.score = 9.9
+        assert record.score is None
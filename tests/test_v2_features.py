@@ -393,6 +393,26 @@ class TestPlugins:
 
         clear_plugins()
 
+    def test_plugin_chains_skip_inherited_hooks(self):
+        """Solo gli hook sovrascritti entrano nella catena; unregister la ricostruisce."""
+        from kore_memory import plugins
+
+        class AuditOnly(plugins.KorePlugin):
+            @property
+            def name(self) -> str:
+                return "audit-only"
+
+            def post_save(self, memory_id, content, category, importance, agent_id):
+                pass
+
+        plugins.register_plugin(AuditOnly())
+        try:
+            assert [name for name, _ in plugins._chains["post_save"]] == ["audit-only"]
+            assert plugins._chains["post_search"] == ()
+        finally:
+            assert plugins.unregister_plugin("audit-only") is True
+        assert plugins._chains["post_save"] == ()
+
 
 # ── Summarizer Unit Tests ────────────────────────────────────────────────────
 